@@ -0,0 +1,24 @@
+"""
+Scaffolding shared by the ``benchmark_*`` management commands.
+
+Benchmarks seed their data inside ``rolled_back()`` so nothing they create
+outlives the run, whatever the command does in between.
+"""
+import time
+from contextlib import contextmanager
+
+from django.contrib.auth import get_user_model
+from django.db import transaction
+
+
+@contextmanager
+def rolled_back():
+    """Run the block in a transaction that is always rolled back"""
+    with transaction.atomic():
+        yield
+        transaction.set_rollback(True)
+
+
+def create_user():
+    """Create a throwaway user for seeded benchmark data; call inside ``rolled_back()``"""
+    return get_user_model().objects.create(username=f"bench_{int(time.time())}")
@@ -0,0 +1,212 @@
+"""
+Content-addressed file cache shared by report artifacts (``reports.artifacts``)
+and file conversion results (``file.result_cache``). The standalone converter
+service keeps a copy in ``newcon/content_cache.py``; keep the two in step.
+
+Entries are files named ``<key><extension>`` under ``root/<key[:2]>/``.
+They are written to a ``.part`` file and renamed into place, so readers
+never see half-written entries. Eviction drops entries older than
+``max_age`` seconds, then the least recently used ones until the cache fits
+in ``max_bytes``; a hit bumps the entry's modification time.
+"""
+import logging
+import os
+import shutil
+import threading
+import time
+from contextlib import contextmanager
+
+logger = logging.getLogger(__name__)
+
+
+class MemoryCounters:
+    """Hit/miss counters kept in this process"""
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._values = {}
+
+    def incr(self, name, amount=1):
+        with self._lock:
+            self._values[name] = self._values.get(name, 0) + amount
+
+    def get(self, name):
+        with self._lock:
+            return self._values.get(name, 0)
+
+
+class BackendCounters:
+    """
+    Counters in a cache backend, e.g. a Django cache. They are only shared
+    between processes when the backend is (Redis, not LocMemCache).
+    ``get_backend`` is called on each use so the backend can be looked up
+    lazily.
+    """
+    def __init__(self, get_backend, prefix):
+        self._get_backend = get_backend
+        self._prefix = prefix
+
+    def incr(self, name, amount=1):
+        backend = self._get_backend()
+        key = f"{self._prefix}:{name}"
+        backend.add(key, 0, None)
+        try:
+            backend.incr(key, amount)
+        except ValueError:
+            # The counter was evicted between add() and incr()
+            backend.set(key, amount, None)
+
+    def get(self, name):
+        return self._get_backend().get(f"{self._prefix}:{name}", 0)
+
+
+class ContentCache:
+    """
+    Files keyed by content hash. ``evict_interval`` is the minimum number of
+    seconds between the evictions ``store``/``write``/``tee`` trigger in
+    this process; None leaves eviction to explicit ``evict()`` calls.
+    """
+    def __init__(self, root, max_bytes, max_age, evict_interval=60, counters=None, name="content cache"):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.evict_interval = evict_interval
+        self.counters = counters or MemoryCounters()
+        self.name = name
+        self._last_eviction = 0
+        self._eviction_lock = threading.Lock()
+
+    def path(self, key, extension):
+        return os.path.join(self.root, key[:2], f"{key}{extension}")
+
+    def lookup(self, key, extensions):
+        """
+        Return the path of the entry for ``key`` with one of ``extensions``
+        (a string or a sequence), or None on a miss. A hit counts the
+        file's size towards the bytes saved.
+        """
+        if isinstance(extensions, str):
+            extensions = (extensions,)
+        for extension in extensions:
+            path = self.path(key, extension)
+            try:
+                # Bump the modification time so eviction treats the entry as recently used
+                os.utime(path)
+                size = os.path.getsize(path)
+            except FileNotFoundError:
+                continue
+            self.counters.incr('hits')
+            self.counters.incr('bytes_saved', size)
+            return path
+        self.counters.incr('misses')
+        return None
+
+    @contextmanager
+    def _publishing(self, key, extension):
+        """Open a temporary file for an entry and rename it into place on success"""
+        path = self.path(key, extension)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.part"
+        try:
+            with open(tmp_path, 'wb') as output:
+                yield output
+            os.replace(tmp_path, path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    def write(self, key, extension, write):
+        """Create an entry by calling ``write(output)`` with a binary file object"""
+        with self._publishing(key, extension) as output:
+            write(output)
+        self.maybe_evict()
+        return self.path(key, extension)
+
+    def store(self, key, source_path):
+        """
+        Copy a finished file into the cache under its own extension. Never
+        hard-linked: the source may be rewritten in place later.
+        """
+        extension = os.path.splitext(source_path)[1].lower()
+        with self._publishing(key, extension) as output, open(source_path, 'rb') as source:
+            shutil.copyfileobj(source, output)
+        self.maybe_evict()
+        return self.path(key, extension)
+
+    def tee(self, key, extension, chunks):
+        """
+        Pass ``chunks`` through unchanged while also writing them to the
+        cache. The entry is only published if the generator runs to completion.
+        """
+        with self._publishing(key, extension) as output:
+            for chunk in chunks:
+                output.write(chunk.encode('utf-8') if isinstance(chunk, str) else chunk)
+                yield chunk
+        self.maybe_evict()
+
+    def entries(self):
+        """Yield (path, size, mtime) for every finished entry on disk"""
+        for directory, _, files in os.walk(self.root):
+            for name in files:
+                if name.endswith('.part'):
+                    continue
+                path = os.path.join(directory, name)
+                try:
+                    stat = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                yield path, stat.st_size, stat.st_mtime
+
+    def evict(self, max_bytes=None, max_age=None, now=None):
+        """
+        Remove entries older than ``max_age`` seconds, then the least recently
+        used ones until the cache fits in ``max_bytes``. Returns (files, bytes) removed.
+        """
+        max_bytes = self.max_bytes if max_bytes is None else max_bytes
+        max_age = self.max_age if max_age is None else max_age
+        now = now or time.time()
+
+        entries = sorted(self.entries(), key=lambda entry: entry[2])
+        total = sum(size for _, size, _ in entries)
+        removed_files = removed_bytes = 0
+
+        for path, size, mtime in entries:
+            if now - mtime <= max_age and total <= max_bytes:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+            removed_files += 1
+            removed_bytes += size
+
+        return removed_files, removed_bytes
+
+    def maybe_evict(self):
+        """Run eviction at most once per ``evict_interval`` in this process"""
+        if self.evict_interval is None:
+            return
+        with self._eviction_lock:
+            if time.time() - self._last_eviction < self.evict_interval:
+                return
+            self._last_eviction = time.time()
+        try:
+            self.evict()
+        except OSError as e:
+            logger.error(f"Error evicting {self.name}: {str(e)}")
+
+    def stats(self):
+        """Return hit/miss counters, bytes saved and the current size of the cache"""
+        hits = self.counters.get('hits')
+        misses = self.counters.get('misses')
+        entries = list(self.entries())
+        lookups = hits + misses
+        return {
+            'hits': hits,
+            'misses': misses,
+            'hit_rate': round(hits / lookups, 3) if lookups else 0,
+            'bytes_saved': self.counters.get('bytes_saved'),
+            'entries': len(entries),
+            'bytes': sum(size for _, size, _ in entries),
+        }
+
@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.1/ref/settings/
 """
 
+import os
 from pathlib import Path
 from datetime import timedelta
 
@@ -172,17 +173,141 @@ CORS_ALLOWED_ORIGINS = [
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
-# Channel layers configuration
-CHANNEL_LAYERS = {
-    'default': {
-        'BACKEND': 'channels.layers.InMemoryChannelLayer',
-        # For production, use Redis:
-        # 'BACKEND': 'channels_redis.core.RedisChannelLayer',
-        # 'CONFIG': {
-        #     "hosts": [('127.0.0.1', 6379)],
-        # },
-    },
-}
+# Channel layers configuration. Set CHANNEL_REDIS_HOSTS to a comma separated
+# list of redis URLs so chat groups reach sockets on every daphne worker.
+# With several hosts, channels_redis shards channels and chat_<room_id>
+# groups across them by consistent hashing of their names.
+CHANNEL_REDIS_HOSTS = [host for host in os.environ.get('CHANNEL_REDIS_HOSTS', '').split(',') if host]
+CHANNEL_LAYER_CAPACITY = int(os.environ.get('CHANNEL_LAYER_CAPACITY', 1000))  # queued messages per channel
+CHANNEL_LAYER_EXPIRY = 60  # seconds an undelivered message is kept
+CHANNEL_GROUP_EXPIRY = 24 * 60 * 60  # seconds a socket stays in a group without re-joining
+
+if CHANNEL_REDIS_HOSTS:
+    CHANNEL_LAYERS = {
+        'default': {
+            'BACKEND': 'channels_redis.core.RedisChannelLayer',
+            'CONFIG': {
+                'hosts': CHANNEL_REDIS_HOSTS,
+                'prefix': 'innocence',
+                'capacity': CHANNEL_LAYER_CAPACITY,
+                'expiry': CHANNEL_LAYER_EXPIRY,
+                'group_expiry': CHANNEL_GROUP_EXPIRY,
+            },
+        },
+    }
+else:
+    # Single process only: group messages never leave this worker
+    CHANNEL_LAYERS = {
+        'default': {
+            'BACKEND': 'channels.layers.InMemoryChannelLayer',
+            'CONFIG': {
+                'capacity': CHANNEL_LAYER_CAPACITY,
+                'expiry': CHANNEL_LAYER_EXPIRY,
+                'group_expiry': CHANNEL_GROUP_EXPIRY,
+            },
+        },
+    }
+
+# Set CACHE_REDIS_URL so every worker shares one cache: dashboard stats are
+# invalidated, and presence and cache hit counters are seen, across processes.
+CACHE_REDIS_URL = os.environ.get('CACHE_REDIS_URL', '')
+
+if CACHE_REDIS_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django_redis.cache.RedisCache',
+            'LOCATION': CACHE_REDIS_URL,
+            'KEY_PREFIX': 'innocence',
+        },
+    }
+else:
+    # Single process only: every worker keeps its own copy
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        },
+    }
+
+# Chat messages are written in batches: a worker flushes its queue every
+# CHAT_WRITE_INTERVAL seconds or as soon as CHAT_WRITE_BATCH_SIZE are waiting
+CHAT_WRITE_BATCH_SIZE = 100
+CHAT_WRITE_INTERVAL = 0.01  # seconds
+
+# Typing indicators are coalesced per room: at most one update every
+# CHAT_TYPING_INTERVAL seconds, and typers expire after CHAT_TYPING_TTL
+CHAT_TYPING_INTERVAL = 0.3  # seconds
+CHAT_TYPING_TTL = 6  # seconds
+
+# Presence lives in CHAT_PRESENCE_CACHE, never in the database. Workers
+# refresh their connected users every CHAT_PRESENCE_HEARTBEAT seconds and a
+# user counts as online for CHAT_PRESENCE_TIMEOUT after the last refresh.
+# Use a shared cache (e.g. Redis) when running more than one worker.
+CHAT_PRESENCE_CACHE = 'default'
+CHAT_PRESENCE_HEARTBEAT = 25  # seconds
+CHAT_PRESENCE_TIMEOUT = 60  # seconds
+
+# Chat attachments are streamed to disk, stored once per content hash and
+# limited to CHAT_ATTACHMENT_MAX_BYTES. Image thumbnails of at most
+# CHAT_THUMBNAIL_SIZE pixels are rendered by a background thread pool.
+CHAT_ATTACHMENT_MAX_BYTES = 25 * 1024 * 1024
+CHAT_THUMBNAIL_SIZE = 320
+CHAT_THUMBNAIL_WORKERS = 2
+
+# Dashboard stats cache: any alias from CACHES can be used. Entries are
+# per user and dropped whenever one of the user's tasks is saved or deleted.
+# Without CACHE_REDIS_URL that only reaches the worker that saved the task,
+# so the timeout is kept short to bound how stale other workers can be.
+DASHBOARD_STATS_CACHE = 'default'
+DASHBOARD_STATS_CACHE_TIMEOUT = 60 if CACHE_REDIS_URL else 10  # seconds
+
+# Background report generation: worker processes per web process. Reports still
+# pending or running after REPORT_JOB_TIMEOUT are marked failed and rebuilt
+# on the next request, since their worker died with its process.
+REPORT_WORKERS = 2
+REPORT_JOB_TIMEOUT = 15 * 60  # seconds
+
+# Rendered reports are cached under MEDIA_ROOT/report_cache, keyed by their
+# parameters and a watermark of the underlying data. Entries older than
+# REPORT_CACHE_MAX_AGE are dropped, then the least recently used ones until
+# the cache fits in REPORT_CACHE_MAX_BYTES.
+REPORT_CACHE_MAX_BYTES = 512 * 1024 * 1024
+REPORT_CACHE_MAX_AGE = 7 * 24 * 60 * 60  # seconds
+REPORT_CACHE_EVICT_INTERVAL = 60  # seconds between automatic evictions per process
+# Hit counters live in this cache alias; without CACHE_REDIS_URL they are per worker
+REPORT_CACHE_STATS_CACHE = 'default'
+
+# PDF detail tables show at most this many rows per section; the rest are
+# summarized, or listed in an appendix when REPORT_PDF_APPENDIX is on
+REPORT_PDF_MAX_ROWS = 2000
+REPORT_PDF_APPENDIX = False
+
+# File conversions run in a pool of FILE_CONVERSION_WORKERS processes per web
+# process. Up to FILE_CONVERSION_QUEUE_SIZE more jobs may wait for a worker;
+# beyond that requests get a 503. /api/file/convert/ waits at most
+# FILE_CONVERSION_SYNC_TIMEOUT seconds before answering with a job to poll.
+FILE_CONVERSION_WORKERS = 2
+FILE_CONVERSION_QUEUE_SIZE = 8
+FILE_CONVERSION_SYNC_TIMEOUT = 30  # seconds
+FILE_CONVERSION_RETENTION = 60 * 60  # seconds finished jobs and their files are kept
+# Submitting a job prunes expired ones at most this often per process (None: only
+# the prune_conversion_jobs command does)
+FILE_CONVERSION_PRUNE_INTERVAL = 60  # seconds
+
+# Conversion results are cached under results/cache, keyed by the SHA-256 of
+# the upload, the conversion type and its options. Entries older than
+# FILE_CONVERSION_CACHE_MAX_AGE are dropped, then the least recently used
+# ones until the cache fits in FILE_CONVERSION_CACHE_MAX_BYTES.
+FILE_CONVERSION_CACHE_MAX_BYTES = 1024 * 1024 * 1024
+FILE_CONVERSION_CACHE_MAX_AGE = 7 * 24 * 60 * 60  # seconds
+FILE_CONVERSION_CACHE_EVICT_INTERVAL = 60  # seconds between automatic evictions per process
+FILE_CONVERSION_CACHE_STATS_CACHE = 'default'
+
+# pdf_to_img renders pages in up to FILE_RASTER_WORKERS processes per
+# conversion (None: one per CPU). Each conversion worker may start its own
+# set, so keep FILE_CONVERSION_WORKERS * FILE_RASTER_WORKERS near the core count.
+FILE_RASTER_WORKERS = None
+# Likewise for the page ranges pdf_to_word parses concurrently
+FILE_DOCX_WORKERS = None
 
 # Email Configuration
 EMAIL_BACKEND = 'django.core.mail.backends.console.EmailBackend'  # For development (prints emails to console)
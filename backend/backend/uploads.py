@@ -0,0 +1,40 @@
+"""
+Upload handling shared by apps that key stored files by content hash.
+"""
+import hashlib
+
+from django.core.files.uploadedfile import TemporaryUploadedFile
+from django.core.files.uploadhandler import FileUploadHandler, StopUpload
+
+
+class HashingUploadHandler(FileUploadHandler):
+    """
+    Writes every uploaded file straight to a temporary file, whatever its
+    size, and computes its SHA-256 on the way. Uploads over ``max_size``
+    bytes (None: no limit) are abandoned and flagged in ``too_large``.
+    """
+    def __init__(self, request=None, max_size=None):
+        super().__init__(request)
+        self.max_size = max_size
+        self.too_large = False
+
+    def new_file(self, *args, **kwargs):
+        super().new_file(*args, **kwargs)
+        self.file = TemporaryUploadedFile(self.file_name, self.content_type, 0, self.charset, self.content_type_extra)
+        self.digest = hashlib.sha256()
+        self.size = 0
+
+    def receive_data_chunk(self, raw_data, start):
+        self.size += len(raw_data)
+        if self.max_size is not None and self.size > self.max_size:
+            self.too_large = True
+            self.file.close()
+            raise StopUpload(connection_reset=True)
+        self.digest.update(raw_data)
+        self.file.write(raw_data)
+
+    def file_complete(self, file_size):
+        self.file.seek(0)
+        self.file.size = file_size
+        self.file.sha256 = self.digest.hexdigest()
+        return self.file
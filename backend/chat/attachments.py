@@ -0,0 +1,117 @@
+"""
+Chat attachment pipeline. Uploads are streamed to a temporary file by
+``HashingUploadHandler``, which hashes every chunk as it arrives; ``store``
+then keeps one copy per SHA-256 under ``chat_attachments/`` and thumbnails
+of images are rendered on a background thread pool after the request.
+"""
+import io
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import IntegrityError, close_old_connections, transaction
+
+from backend import uploads
+
+from .models import ChatAttachment
+
+logger = logging.getLogger(__name__)
+
+# Content types Pillow is asked to thumbnail
+THUMBNAIL_TYPES = {'image/jpeg', 'image/png', 'image/gif', 'image/webp', 'image/bmp'}
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=getattr(settings, 'CHAT_THUMBNAIL_WORKERS', 2),
+                thread_name_prefix='chat-thumbnail'
+            )
+        return _executor
+
+
+def max_upload_size():
+    return getattr(settings, 'CHAT_ATTACHMENT_MAX_BYTES', 25 * 1024 * 1024)
+
+
+class HashingUploadHandler(uploads.HashingUploadHandler):
+    """Hashing upload handler limited to ``CHAT_ATTACHMENT_MAX_BYTES``"""
+    def __init__(self, request=None):
+        super().__init__(request, max_size=max_upload_size())
+
+
+def storage_name(digest, filename):
+    extension = os.path.splitext(filename)[1].lower()[:16]
+    return f"chat_attachments/{digest[:2]}/{digest}{extension}"
+
+
+def store(uploaded):
+    """
+    Return the ``ChatAttachment`` for an upload received by
+    ``HashingUploadHandler``, writing the file only if its content has not
+    been stored before. The temporary file is moved, not copied.
+    """
+    digest = uploaded.sha256
+    attachment = ChatAttachment.objects.filter(sha256=digest).first()
+    if attachment is not None:
+        uploaded.close()
+        return attachment
+
+    name = storage_name(digest, uploaded.name)
+    if not default_storage.exists(name):
+        name = default_storage.save(name, uploaded)
+    uploaded.close()
+
+    try:
+        with transaction.atomic():
+            attachment = ChatAttachment.objects.create(
+                sha256=digest,
+                file=name,
+                size=uploaded.size,
+                content_type=uploaded.content_type or ''
+            )
+    except IntegrityError:
+        # Someone stored the same content concurrently; theirs wins
+        return ChatAttachment.objects.get(sha256=digest)
+
+    if attachment.content_type in THUMBNAIL_TYPES:
+        transaction.on_commit(lambda: _get_executor().submit(make_thumbnail, attachment.pk))
+    return attachment
+
+
+def make_thumbnail(attachment_id):
+    """Render an image attachment's thumbnail. Runs on a worker thread."""
+    from PIL import Image, ImageOps
+
+    close_old_connections()
+    try:
+        attachment = ChatAttachment.objects.get(pk=attachment_id)
+        if attachment.thumbnail:
+            return
+        size = getattr(settings, 'CHAT_THUMBNAIL_SIZE', 320)
+        with default_storage.open(attachment.file.name, 'rb') as source:
+            image = Image.open(source)
+            # Lets JPEG decode at a reduced scale instead of full resolution
+            image.draft('RGB', (size, size))
+            image = ImageOps.exif_transpose(image)
+            image.thumbnail((size, size))
+            output = io.BytesIO()
+            image.convert('RGB').save(output, 'JPEG', quality=85)
+
+        name = default_storage.save(
+            f"chat_attachments/thumbnails/{attachment.sha256}.jpg", ContentFile(output.getvalue())
+        )
+        ChatAttachment.objects.filter(pk=attachment_id).update(thumbnail=name)
+    except Exception as e:
+        logger.error(f"Error creating thumbnail for attachment {attachment_id}: {str(e)}")
+    finally:
+        close_old_connections()
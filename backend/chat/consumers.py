@@ -1,80 +1,114 @@
 import json
+import time
 from channels.generic.websocket import AsyncWebsocketConsumer
 from channels.db import database_sync_to_async
 from django.contrib.auth import get_user_model
-from .models import ChatRoom, Message, ReadReceipt
+from .models import ChatRoom
+from .message_writer import get_writer
+from .typing import get_coalescer
+from .presence import get_tracker
+from . import read_state
 
 User = get_user_model()
 
+def display_name(user):
+    return f"{user.first_name} {user.last_name}" if user.first_name else user.username
+
+
+def user_group_name(user_id):
+    return f'chat_user_{user_id}'
+
+
 class ChatConsumer(AsyncWebsocketConsumer):
+    """
+    Room membership and the sender's display name are loaded once in
+    connect and reused for every frame. Signals in ``chat.signals`` push
+    ``room_changed``, ``room_deleted`` and ``user_changed`` events over the
+    channel layer when that state goes stale.
+    """
     async def connect(self):
         self.user = self.scope['user']
-        self.room_id = self.scope['url_route']['kwargs']['room_id']
+        self.room_id = int(self.scope['url_route']['kwargs']['room_id'])
         self.room_group_name = f'chat_{self.room_id}'
+        self.room = None
+        # Typing state per worker process, merged into self.typing_users
+        self.typing_origins = {}
+        self.typing_users = {}
+
+        if not self.user.is_authenticated:
+            await self.close()
+            return
 
-        # Join room group
+        self.room = await self.load_room()
+        if self.room is None:
+            await self.close()
+            return
+        self.sender_name = display_name(self.user)
+
+        # Join room group, plus a per-user group for profile changes
         await self.channel_layer.group_add(
             self.room_group_name,
             self.channel_name
         )
+        await self.channel_layer.group_add(
+            user_group_name(self.user.id),
+            self.channel_name
+        )
 
         await self.accept()
+        await get_tracker().connect(self.user.id)
 
     async def disconnect(self, close_code):
+        if self.room is None:
+            return
+
+        get_coalescer().update(self.room_id, self.user.id, self.user.username, False)
+        await get_tracker().disconnect(self.user.id)
+
         # Leave room group
         await self.channel_layer.group_discard(
             self.room_group_name,
             self.channel_name
         )
+        await self.channel_layer.group_discard(
+            user_group_name(self.user.id),
+            self.channel_name
+        )
 
     async def receive(self, text_data):
         data = json.loads(text_data)
         message_type = data.get('type', 'message')
         
         if message_type == 'message':
-            message = await self.save_message(
+            content = data.get('message')
+            file_url = data.get('file_url', None)
+            # Attachments may come without text, but never without a string
+            if not isinstance(content, str) or not (content.strip() or file_url):
+                await self.chat_error({'chat_id': self.room_id, 'error': 'Message must be non-empty text'})
+                return
+            get_coalescer().update(self.room_id, self.user.id, self.user.username, False)
+            # Stored and broadcast with its database id by the process-wide writer
+            await get_writer().submit(
                 room_id=self.room_id,
-                user_id=self.user.id,
-                message=data['message'],
-                file_url=data.get('file_url', None)
-            )
-            
-            # Send message to room group with room id included
-            await self.channel_layer.group_send(
-                self.room_group_name,
-                {
-                    'type': 'chat_message',
-                    'chat_id': self.room_id,  # add room id here
-                    'id': message['id'],
-                    'message': message['content'],
-                    'file_url': message['file'],
-                    'sender_id': message['sender_id'],
-                    'sender_name': message['sender_name'],
-                    'timestamp': str(message['timestamp'])
-                }
+                sender_id=self.user.id,
+                sender_name=self.sender_name,
+                content=content,
+                file_url=file_url,
+                reply_channel=self.channel_name
             )
+        elif message_type == 'heartbeat':
+            await get_tracker().touch(self.user.id)
         elif message_type == 'typing':
-            await self.channel_layer.group_send(
-                self.room_group_name,
-                {
-                    'type': 'user_typing',
-                    'user_id': self.user.id,
-                    'username': self.user.username,
-                    'is_typing': data['is_typing']
-                }
-            )
+            get_coalescer().update(self.room_id, self.user.id, self.user.username, bool(data.get('is_typing')))
         elif message_type == 'read':
-            await self.mark_messages_read(
-                room_id=self.room_id,
-                user_id=self.user.id,
-                message_ids=data.get('message_ids', [])
-            )
+            last_read = await self.mark_messages_read(message_ids=data.get('message_ids', []))
             await self.channel_layer.group_send(
                 self.room_group_name,
                 {
                     'type': 'read_receipt',
                     'user_id': self.user.id,
-                    'message_ids': data.get('message_ids', [])
+                    'message_ids': data.get('message_ids', []),
+                    'last_read_message_id': last_read
                 }
             )
 
@@ -91,51 +125,75 @@ class ChatConsumer(AsyncWebsocketConsumer):
             'timestamp': event.get('timestamp')
         }))
 
-    async def user_typing(self, event):
+    async def chat_error(self, event):
         await self.send(text_data=json.dumps({
-            'type': 'typing',
-            'user_id': event.get('user_id'),
-            'username': event.get('username'),
-            'is_typing': event.get('is_typing')
+            'type': 'error',
+            'chat_id': event.get('chat_id'),
+            'error': event.get('error')
         }))
 
+    async def typing_state(self, event):
+        """
+        Merge one worker's typers into this socket's view of the room and
+        send a typing frame for every user who started or stopped typing.
+        """
+        now = time.monotonic()
+        self.typing_origins[event['origin']] = (
+            {user['user_id']: user['username'] for user in event['users']},
+            now + event['ttl']
+        )
+
+        typing = {}
+        for origin, (users, expires) in list(self.typing_origins.items()):
+            if expires <= now:
+                del self.typing_origins[origin]
+            else:
+                typing.update(users)
+        typing.pop(self.user.id, None)
+
+        for user_id in typing.keys() | self.typing_users.keys():
+            if (user_id in typing) != (user_id in self.typing_users):
+                await self.send(text_data=json.dumps({
+                    'type': 'typing',
+                    'user_id': user_id,
+                    'username': typing.get(user_id) or self.typing_users.get(user_id),
+                    'is_typing': user_id in typing
+                }))
+        self.typing_users = typing
+
     async def read_receipt(self, event):
         await self.send(text_data=json.dumps({
             'type': 'read',
             'user_id': event.get('user_id'),
-            'message_ids': event.get('message_ids')
+            'message_ids': event.get('message_ids'),
+            'last_read_message_id': event.get('last_read_message_id')
         }))
 
+    async def room_changed(self, event):
+        """Membership or room details changed; drop the socket if the user was removed"""
+        removed = event.get('removed_user_ids')
+        if removed is not None and self.user.id not in removed:
+            return
+        self.room = await self.load_room()
+        if self.room is None:
+            await self.close()
+
+    async def room_deleted(self, event):
+        await self.close()
+
+    async def user_changed(self, event):
+        self.user = await self.load_user()
+        self.sender_name = display_name(self.user)
+
     @database_sync_to_async
-    def save_message(self, room_id, user_id, message, file_url=None):
-        room = ChatRoom.objects.get(id=room_id)
-        user = User.objects.get(id=user_id)
-        msg = Message.objects.create(
-            room=room,
-            sender=user,
-            content=message,
-            file=file_url
-        )
-        room.updated_at = msg.timestamp
-        room.save()
-        
-        return {
-            'id': msg.id,
-            'content': msg.content,
-            'file': msg.file.url if msg.file else None,
-            'sender_id': user.id,
-            'sender_name': f"{user.first_name} {user.last_name}" if user.first_name else user.username,
-            'timestamp': msg.timestamp
-        }
+    def load_room(self):
+        """Return the room if the connected user is a member of it"""
+        return ChatRoom.objects.filter(pk=self.room_id, users=self.user).first()
+
+    @database_sync_to_async
+    def load_user(self):
+        return User.objects.get(pk=self.user.id)
 
     @database_sync_to_async
-    def mark_messages_read(self, room_id, user_id, message_ids=None):
-        user = User.objects.get(id=user_id)
-        room = ChatRoom.objects.get(id=room_id)
-        messages_to_mark = Message.objects.filter(room=room).exclude(sender=user)
-        if message_ids:
-            messages_to_mark = messages_to_mark.filter(id__in=message_ids)
-        for msg in messages_to_mark:
-            ReadReceipt.objects.get_or_create(message=msg, user=user)
-            msg.is_read = True
-            msg.save()
\ No newline at end of file
+    def mark_messages_read(self, message_ids=None):
+        return read_state.mark_read(self.user.id, self.room_id, message_ids)
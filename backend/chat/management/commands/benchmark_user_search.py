@@ -0,0 +1,84 @@
+import random
+import statistics
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.db.models import Q
+
+from backend import benchmarks
+from chat import user_search
+from chat.models import UserSearchEntry
+
+User = get_user_model()
+
+FIRST_NAMES = ['anna', 'boris', 'carla', 'dmitri', 'elena', 'farid', 'grace', 'hiro', 'ines', 'jonas', 'kemal', 'lina']
+LAST_NAMES = ['smith', 'ivanova', 'garcia', 'nguyen', 'okafor', 'rossi', 'tanaka', 'muller', 'haddad', 'kowalski']
+
+
+class Command(BaseCommand):
+    help = 'Compares the legacy icontains user search with the prefix index over seeded users'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=1000000, help='Number of users to seed')
+        parser.add_argument('--repeat', type=int, default=20, help='Runs per query')
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'postgresql':
+            # varchar_pattern_ops is only honoured by PostgreSQL; other backends
+            # build plain indexes that cannot range-scan LIKE 'term%'
+            self.stdout.write(self.style.WARNING(
+                f"Running on {connection.vendor}: these numbers do not cover the "
+                "PostgreSQL prefix index. Benchmark on PostgreSQL to measure it."
+            ))
+        with benchmarks.rolled_back():
+            self._seed(options['users'])
+            self._run(options['repeat'])
+
+    def _seed(self, count):
+        prefix = f"bench{int(time.time())}"
+        started = time.perf_counter()
+        User.objects.bulk_create(
+            (
+                User(
+                    username=f"{prefix}_{random.choice(FIRST_NAMES)}{i}",
+                    first_name=random.choice(FIRST_NAMES).title(),
+                    last_name=random.choice(LAST_NAMES).title(),
+                    email=f"user{i}@example.com",
+                    password='!',
+                )
+                for i in range(count)
+            ),
+            batch_size=5000
+        )
+        # bulk_create skips signals, so index the new users in one pass
+        indexed = user_search.rebuild()
+        self.stdout.write(f"Seeded and indexed {indexed} users in {time.perf_counter() - started:.1f}s")
+
+    def _legacy(self, query):
+        return User.objects.filter(
+            Q(username__icontains=query) |
+            Q(first_name__icontains=query) |
+            Q(last_name__icontains=query) |
+            Q(email__icontains=query)
+        ).distinct()
+
+    def _time(self, fetch, repeat):
+        timings = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            rows = fetch()
+            timings.append((time.perf_counter() - started) * 1000)
+        return statistics.median(timings), len(rows)
+
+    def _run(self, repeat):
+        queries = ['a', 'gra', 'grace ros', 'tanaka', 'user4242', 'zzz']
+        self.stdout.write(f"{'query':>12} {'legacy ms':>10} {'rows':>8} {'index ms':>10} {'rows':>6}")
+        for query in queries:
+            # The legacy endpoint had no limit, so it materialized every match
+            legacy_ms, legacy_rows = self._time(lambda: list(self._legacy(query).values_list('pk', flat=True)), max(1, repeat // 10))
+            index_ms, index_rows = self._time(lambda: list(user_search.search(query).values_list('pk', flat=True)), repeat)
+            self.stdout.write(f"{query:>12} {legacy_ms:>10.1f} {legacy_rows:>8} {index_ms:>10.2f} {index_rows:>6}")
+
+        self.stdout.write(UserSearchEntry.objects.filter(username__startswith='gra').order_by('username', 'pk')[:user_search.SEARCH_LIMIT].explain())
@@ -0,0 +1,160 @@
+import asyncio
+import copy
+import multiprocessing
+import threading
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.module_loading import import_string
+
+REDIS_BACKEND = 'channels_redis.core.RedisChannelLayer'
+
+
+def _subscriber_worker(room, index, subscribers, workers):
+    """Worker process that hosts subscriber ``index`` of ``room``"""
+    return (room * subscribers + index) % workers
+
+
+def _expected_deliveries(worker, workers, rooms, subscribers, messages):
+    """Number of group messages the sockets held by ``worker`` should receive"""
+    per_room = [
+        sum(1 for index in range(subscribers) if _subscriber_worker(room, index, subscribers, workers) == worker)
+        for room in range(rooms)
+    ]
+    return sum(per_room[message % rooms] for message in range(messages))
+
+
+async def _run_worker(worker, workers, layer_settings, options, barrier, results):
+    layer = import_string(layer_settings['BACKEND'])(**layer_settings.get('CONFIG', {}))
+    rooms, subscribers, messages = options['rooms'], options['subscribers'], options['messages']
+
+    # Join this worker's share of sockets to their chat_<room_id> groups
+    channels = []
+    for room in range(rooms):
+        for index in range(subscribers):
+            if _subscriber_worker(room, index, subscribers, workers) == worker:
+                channel = await layer.new_channel()
+                await layer.group_add(f"chat_{room}", channel)
+                channels.append(channel)
+
+    expected = _expected_deliveries(worker, workers, rooms, subscribers, messages)
+    received = 0
+    done = asyncio.Event()
+    if expected == 0:
+        done.set()
+
+    async def receive(channel):
+        nonlocal received
+        while True:
+            await layer.receive(channel)
+            received += 1
+            if received >= expected:
+                done.set()
+
+    receivers = [asyncio.ensure_future(receive(channel)) for channel in channels]
+    await asyncio.get_running_loop().run_in_executor(None, barrier.wait)
+    started = time.perf_counter()
+
+    # Each worker publishes its share of the messages, like sockets posting in parallel
+    for message in range(worker, messages, workers):
+        await layer.group_send(
+            f"chat_{message % rooms}",
+            {'type': 'chat_message', 'id': message, 'message': 'x' * options['size']}
+        )
+
+    try:
+        await asyncio.wait_for(done.wait(), options['timeout'])
+    except asyncio.TimeoutError:
+        pass
+    elapsed = time.perf_counter() - started
+
+    for receiver in receivers:
+        receiver.cancel()
+    for room in range(rooms):
+        for channel in channels:
+            await layer.group_discard(f"chat_{room}", channel)
+    results.put((worker, expected, received, elapsed))
+
+
+def _worker_main(worker, workers, layer_settings, options, barrier, results):
+    asyncio.run(_run_worker(worker, workers, layer_settings, options, barrier, results))
+
+
+class Command(BaseCommand):
+    help = 'Measures chat group broadcast throughput across several channel layer worker processes'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4], help='Worker process counts to measure')
+        parser.add_argument('--rooms', type=int, default=50, help='Number of chat_<room_id> groups')
+        parser.add_argument('--subscribers', type=int, default=4, help='Sockets per room, spread over the workers')
+        parser.add_argument('--messages', type=int, default=2000, help='Group messages sent per run')
+        parser.add_argument('--size', type=int, default=200, help='Message body size in bytes')
+        parser.add_argument('--timeout', type=float, default=60, help='Seconds to wait for deliveries')
+        parser.add_argument('--hosts', nargs='+', help='Redis URLs, overriding CHANNEL_LAYERS')
+        parser.add_argument(
+            '--fake-redis', type=int, default=0, metavar='SHARDS',
+            help='Start this many local fakeredis servers as a stand-in for Redis'
+        )
+
+    def handle(self, *args, **options):
+        layer_settings = copy.deepcopy(settings.CHANNEL_LAYERS['default'])
+        hosts = options['hosts']
+        if options['fake_redis']:
+            hosts = self._start_fake_redis(options['fake_redis'])
+        if hosts:
+            layer_settings['BACKEND'] = REDIS_BACKEND
+            layer_settings.setdefault('CONFIG', {})['hosts'] = hosts
+
+        if layer_settings['BACKEND'] != REDIS_BACKEND and max(options['workers']) > 1:
+            raise CommandError(
+                f"{layer_settings['BACKEND']} does not deliver across processes; "
+                "set CHANNEL_REDIS_HOSTS or pass --hosts / --fake-redis"
+            )
+
+        # Every queued message must fit or the layer drops it silently
+        config = layer_settings.setdefault('CONFIG', {})
+        config['capacity'] = max(config.get('capacity', 100), options['messages'])
+
+        self.stdout.write(
+            f"{layer_settings['BACKEND']} hosts={len(hosts or [])} rooms={options['rooms']} "
+            f"subscribers={options['subscribers']} messages={options['messages']}"
+        )
+        self.stdout.write(f"{'workers':>8} {'delivered':>10} {'expected':>10} {'seconds':>8} {'msgs/s':>10}")
+        for workers in options['workers']:
+            expected, delivered, elapsed = self._measure(workers, layer_settings, options)
+            self.stdout.write(
+                f"{workers:>8} {delivered:>10} {expected:>10} {elapsed:>8.2f} {delivered / elapsed:>10.0f}"
+            )
+
+    def _measure(self, workers, layer_settings, options):
+        context = multiprocessing.get_context('fork')
+        barrier = context.Barrier(workers)
+        results = context.Queue()
+        processes = [
+            context.Process(target=_worker_main, args=(worker, workers, layer_settings, options, barrier, results))
+            for worker in range(workers)
+        ]
+        for process in processes:
+            process.start()
+        outcomes = [results.get() for _ in processes]
+        for process in processes:
+            process.join()
+
+        expected = sum(outcome[1] for outcome in outcomes)
+        delivered = sum(outcome[2] for outcome in outcomes)
+        elapsed = max(outcome[3] for outcome in outcomes)
+        return expected, delivered, elapsed
+
+    def _start_fake_redis(self, shards):
+        try:
+            from fakeredis import TcpFakeServer
+        except ImportError:
+            raise CommandError("--fake-redis needs the fakeredis package (with lupa for Lua scripts)")
+
+        hosts = []
+        for _ in range(shards):
+            server = TcpFakeServer(('127.0.0.1', 0), server_type='redis')
+            threading.Thread(target=server.serve_forever, daemon=True).start()
+            hosts.append(f"redis://127.0.0.1:{server.server_address[1]}")
+        return hosts
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from chat import user_search
+
+
+class Command(BaseCommand):
+    help = 'Rebuilds the user search index, e.g. after users were bulk imported'
+
+    def handle(self, *args, **options):
+        written = user_search.rebuild()
+        self.stdout.write(self.style.SUCCESS(f"Indexed {written} users"))
@@ -0,0 +1,154 @@
+"""
+Write-behind persistence for chat messages. Consumers in a worker process
+hand incoming messages to one shared ``MessageWriter`` that stores them
+with a single ``bulk_create`` per batch and then broadcasts each one to
+its room with the id the database assigned.
+"""
+import asyncio
+import logging
+import weakref
+
+from channels.db import database_sync_to_async
+from channels.layers import get_channel_layer
+from django.conf import settings
+from django.db import transaction
+
+from .models import ChatRoom, Message
+from . import read_state
+
+logger = logging.getLogger(__name__)
+
+# One writer per event loop, i.e. per worker process under daphne
+_writers = weakref.WeakKeyDictionary()
+
+
+def get_writer():
+    loop = asyncio.get_running_loop()
+    writer = _writers.get(loop)
+    if writer is None:
+        writer = MessageWriter(
+            batch_size=getattr(settings, 'CHAT_WRITE_BATCH_SIZE', 100),
+            interval=getattr(settings, 'CHAT_WRITE_INTERVAL', 0.01),
+        )
+        _writers[loop] = writer
+    return writer
+
+
+def persist(batch):
+    """
+    Store a batch of pending messages in one transaction and return their
+    broadcast payloads in submission order. Messages for rooms that no
+    longer exist are dropped.
+    """
+    room_ids = {entry['room_id'] for entry in batch}
+    with transaction.atomic():
+        existing = set(ChatRoom.objects.filter(pk__in=room_ids).values_list('pk', flat=True))
+        entries = [entry for entry in batch if entry['room_id'] in existing]
+        messages = Message.objects.bulk_create([
+            Message(
+                room_id=entry['room_id'],
+                sender_id=entry['sender_id'],
+                content=entry['content'],
+                file=entry['file_url']
+            )
+            for entry in entries
+        ])
+
+        # Room and unread counters move once per room per batch, not per message
+        read_state.record_new_messages(messages)
+
+    return [
+        {
+            'type': 'chat_message',
+            'chat_id': entry['room_id'],
+            'id': message.id,
+            'message': message.content,
+            'file_url': message.file.url if message.file else None,
+            'sender_id': entry['sender_id'],
+            'sender_name': entry['sender_name'],
+            'timestamp': str(message.timestamp)
+        }
+        for entry, message in zip(entries, messages)
+    ]
+
+
+def persist_each(batch):
+    """
+    Store a batch message by message after ``persist`` failed for the whole
+    of it, so one bad entry only costs its own message. Returns the
+    broadcast payloads and the ``(entry, error)`` pairs that still failed.
+    """
+    payloads, failed = [], []
+    for entry in batch:
+        try:
+            payloads.extend(persist([entry]))
+        except Exception as e:
+            logger.error(f"Error saving chat message from user {entry['sender_id']}: {str(e)}")
+            failed.append((entry, str(e)))
+    return payloads, failed
+
+
+class MessageWriter:
+    """
+    Queues messages and flushes them every ``interval`` seconds or once
+    ``batch_size`` are waiting. Flushes are serialized so rooms see their
+    messages in the order they arrived.
+    """
+    def __init__(self, batch_size=100, interval=0.01):
+        self.batch_size = batch_size
+        self.interval = interval
+        self._pending = []
+        self._timer = None
+        # Scheduled flushes, kept so the loop's weak references aren't the only ones
+        self._tasks = set()
+        self._flush_lock = asyncio.Lock()
+        self._channel_layer = get_channel_layer()
+
+    async def submit(self, room_id, sender_id, sender_name, content, file_url=None, reply_channel=None):
+        """Queue a message; ``reply_channel`` is told if it can't be stored"""
+        self._pending.append({
+            'room_id': int(room_id),
+            'sender_id': sender_id,
+            'sender_name': sender_name,
+            'content': content,
+            'file_url': file_url,
+            'reply_channel': reply_channel,
+        })
+        if len(self._pending) >= self.batch_size:
+            # A full batch is written right away; the sender waits for it,
+            # which keeps the queue bounded under bursts
+            await self.flush()
+        elif self._timer is None:
+            self._timer = asyncio.get_running_loop().call_later(self.interval, self._schedule_flush)
+
+    def _schedule_flush(self):
+        self._timer = None
+        task = asyncio.ensure_future(self.flush())
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def flush(self):
+        async with self._flush_lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            batch, self._pending = self._pending, []
+            if not batch:
+                return
+
+            failed = []
+            try:
+                payloads = await database_sync_to_async(persist)(batch)
+            except Exception as e:
+                logger.error(f"Error saving {len(batch)} chat messages, retrying one by one: {str(e)}")
+                payloads, failed = await database_sync_to_async(persist_each)(batch)
+
+            for payload in payloads:
+                await self._channel_layer.group_send(f"chat_{payload['chat_id']}", payload)
+            for entry, error in failed:
+                if entry['reply_channel']:
+                    await self._channel_layer.send(entry['reply_channel'], {
+                        'type': 'chat_error',
+                        'chat_id': entry['room_id'],
+                        'error': 'Message could not be saved',
+                    })
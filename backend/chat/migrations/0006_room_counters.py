@@ -0,0 +1,53 @@
+# Generated by Django 5.2.18 on 2026-10-17 20:27
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count, Max, Q
+
+
+def backfill_room_state(apps, schema_editor):
+    """Fill in last_message and one read state per existing membership"""
+    ChatRoom = apps.get_model('chat', 'ChatRoom')
+    ChatReadState = apps.get_model('chat', 'ChatReadState')
+    Message = apps.get_model('chat', 'Message')
+    Membership = ChatRoom.users.through
+
+    for room_id, last_id in Message.objects.values_list('room_id').annotate(last=Max('id')):
+        ChatRoom.objects.filter(pk=room_id).update(last_message_id=last_id)
+
+    marks = {
+        (state.user_id, state.room_id): state
+        for state in ChatReadState.objects.all()
+    }
+    for room_id, user_id in Membership.objects.values_list('chatroom_id', 'user_id').iterator():
+        others = Message.objects.filter(room_id=room_id).exclude(sender_id=user_id)
+        state = marks.get((user_id, room_id))
+        if state is None:
+            # Start new marks after the last message already flagged as read
+            last_read = others.aggregate(last=Max('id', filter=Q(is_read=True)))['last'] or 0
+            state = ChatReadState(user_id=user_id, room_id=room_id, last_read_message_id=last_read)
+        state.unread_count = others.aggregate(
+            unread=Count('id', filter=Q(is_read=False, id__gt=state.last_read_message_id))
+        )['unread']
+        state.save()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('chat', '0005_chatreadstate'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='chatreadstate',
+            name='unread_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='chatroom',
+            name='last_message',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='chat.message'),
+        ),
+        migrations.RunPython(backfill_room_state, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,49 @@
+# Generated by Django 5.2.18 on 2026-10-17 20:32
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+def index_existing_users(apps, schema_editor):
+    """Index users that existed before the search table"""
+    User = apps.get_model(settings.AUTH_USER_MODEL)
+    UserSearchEntry = apps.get_model('chat', 'UserSearchEntry')
+    batch = []
+    for user in User.objects.only('pk', 'username', 'first_name', 'last_name', 'email').iterator(chunk_size=5000):
+        batch.append(UserSearchEntry(
+            user_id=user.pk,
+            username=user.username.lower(),
+            full_name=f"{user.first_name} {user.last_name}".strip().lower(),
+            last_name=user.last_name.lower(),
+            email=user.email.lower(),
+        ))
+        if len(batch) >= 5000:
+            UserSearchEntry.objects.bulk_create(batch)
+            batch = []
+    UserSearchEntry.objects.bulk_create(batch)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+        ('chat', '0007_message_history_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UserSearchEntry',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='search_entry', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('username', models.CharField(max_length=150)),
+                ('full_name', models.CharField(max_length=301)),
+                ('last_name', models.CharField(max_length=150)),
+                ('email', models.CharField(max_length=254)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['username'], name='chat_usersearch_username', opclasses=['varchar_pattern_ops']), models.Index(fields=['full_name'], name='chat_usersearch_full_name', opclasses=['varchar_pattern_ops']), models.Index(fields=['last_name'], name='chat_usersearch_last_name', opclasses=['varchar_pattern_ops']), models.Index(fields=['email'], name='chat_usersearch_email', opclasses=['varchar_pattern_ops'])],
+            },
+        ),
+        migrations.RunPython(index_existing_users, migrations.RunPython.noop),
+    ]
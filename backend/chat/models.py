@@ -10,6 +10,10 @@ class ChatRoom(models.Model):
     users = models.ManyToManyField(User, related_name="chatrooms")
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+    # Maintained on every insert so room lists don't have to look it up
+    last_message = models.ForeignKey(
+        'Message', on_delete=models.SET_NULL, null=True, blank=True, related_name='+'
+    )
 
     def __str__(self):
         if self.is_group and self.name:
@@ -19,11 +23,29 @@ class ChatRoom(models.Model):
     class Meta:
         ordering = ['-updated_at']
 
+class ChatAttachment(models.Model):
+    """
+    An uploaded file, stored once per distinct content and shared by every
+    message that attaches it. ``thumbnail`` is filled in asynchronously for
+    images.
+    """
+    sha256 = models.CharField(max_length=64, unique=True)
+    file = models.FileField(max_length=255)
+    size = models.BigIntegerField()
+    content_type = models.CharField(max_length=255, blank=True)
+    thumbnail = models.FileField(max_length=255, null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.sha256[:12]} ({self.size} bytes)"
+
 class Message(models.Model):
     room = models.ForeignKey(ChatRoom, on_delete=models.CASCADE, related_name="messages")
     sender = models.ForeignKey(User, on_delete=models.CASCADE, related_name="sent_messages")
     content = models.TextField()
     file = models.FileField(upload_to='chat_files/', null=True, blank=True)
+    # Set for uploads through the attachment pipeline; ``file`` then names the shared copy
+    attachment = models.ForeignKey(ChatAttachment, on_delete=models.SET_NULL, null=True, blank=True, related_name="messages")
     timestamp = models.DateTimeField(auto_now_add=True)
     is_read = models.BooleanField(default=False)
 
@@ -32,6 +54,10 @@ class Message(models.Model):
 
     class Meta:
         ordering = ["timestamp"]
+        indexes = [
+            # Keyset pagination of a room's history
+            models.Index(fields=['room', 'timestamp', 'id'], name='chat_message_room_ts_id'),
+        ]
 
 class ReadReceipt(models.Model):
     message = models.ForeignKey(Message, on_delete=models.CASCADE, related_name="read_receipts")
@@ -40,3 +66,42 @@ class ReadReceipt(models.Model):
 
     class Meta:
         unique_together = ('message', 'user')
+
+class ChatReadState(models.Model):
+    """
+    How far a user has read in a room. Every message in the room with an id
+    up to ``last_read_message_id`` counts as read by the user, and
+    ``unread_count`` holds the number of later messages from other members.
+    One row exists per room membership.
+    """
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="chat_read_states")
+    room = models.ForeignKey(ChatRoom, on_delete=models.CASCADE, related_name="read_states")
+    last_read_message_id = models.BigIntegerField(default=0)
+    unread_count = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'room'], name='unique_chat_read_state')
+        ]
+
+class UserSearchEntry(models.Model):
+    """
+    Lower-cased copies of the fields user search matches on, each indexed for
+    prefix lookups. Kept in sync by ``chat.signals``; rebuild with the
+    ``rebuild_user_search`` command after bulk user imports.
+    """
+    user = models.OneToOneField(User, on_delete=models.CASCADE, primary_key=True, related_name="search_entry")
+    username = models.CharField(max_length=150)
+    full_name = models.CharField(max_length=301)
+    last_name = models.CharField(max_length=150)
+    email = models.CharField(max_length=254)
+
+    class Meta:
+        # varchar_pattern_ops lets PostgreSQL serve LIKE 'term%' from the index
+        indexes = [
+            models.Index(fields=['username'], name='chat_usersearch_username', opclasses=['varchar_pattern_ops']),
+            models.Index(fields=['full_name'], name='chat_usersearch_full_name', opclasses=['varchar_pattern_ops']),
+            models.Index(fields=['last_name'], name='chat_usersearch_last_name', opclasses=['varchar_pattern_ops']),
+            models.Index(fields=['email'], name='chat_usersearch_email', opclasses=['varchar_pattern_ops']),
+        ]
@@ -0,0 +1,102 @@
+"""
+Chat presence kept in the cache instead of the database. Each worker
+process counts its own sockets per user and refreshes their entries every
+``CHAT_PRESENCE_HEARTBEAT`` seconds; a user is online while their entry
+has been refreshed within ``CHAT_PRESENCE_TIMEOUT``. Use a shared cache
+backend (e.g. Redis) so presence is visible across workers.
+"""
+import asyncio
+import time
+import weakref
+
+from django.conf import settings
+from django.core.cache import caches
+
+# One tracker per event loop, i.e. per worker process under daphne
+_trackers = weakref.WeakKeyDictionary()
+
+# Entries outlive the online window so last_seen stays available
+LAST_SEEN_TIMEOUT = 30 * 24 * 60 * 60
+
+
+def _presence_cache():
+    return caches[getattr(settings, 'CHAT_PRESENCE_CACHE', 'default')]
+
+
+def _timeout():
+    return getattr(settings, 'CHAT_PRESENCE_TIMEOUT', 60)
+
+
+def _key(user_id):
+    return f"chat:presence:{user_id}"
+
+
+def get_tracker():
+    loop = asyncio.get_running_loop()
+    tracker = _trackers.get(loop)
+    if tracker is None:
+        tracker = PresenceTracker(
+            heartbeat=getattr(settings, 'CHAT_PRESENCE_HEARTBEAT', 25),
+        )
+        _trackers[loop] = tracker
+    return tracker
+
+
+def lookup(user_ids):
+    """Return ``{user_id: {'online': bool, 'last_seen': unix time or None}}`` in one cache round trip"""
+    entries = _presence_cache().get_many([_key(user_id) for user_id in user_ids])
+    now = time.time()
+    presence = {}
+    for user_id in user_ids:
+        entry = entries.get(_key(user_id))
+        if entry is None:
+            presence[user_id] = {'online': False, 'last_seen': None}
+        else:
+            presence[user_id] = {
+                'online': entry['online_until'] > now,
+                'last_seen': entry['last_seen'],
+            }
+    return presence
+
+
+class PresenceTracker:
+    """Counts this process's sockets per user and keeps their cache entries fresh"""
+    def __init__(self, heartbeat=25):
+        self.heartbeat = heartbeat
+        self._connections = {}
+        self._task = None
+
+    async def connect(self, user_id):
+        self._connections[user_id] = self._connections.get(user_id, 0) + 1
+        if self._connections[user_id] == 1:
+            await self._write([user_id], online=True)
+        if self._task is None or self._task.done():
+            self._task = asyncio.ensure_future(self._beat())
+
+    async def disconnect(self, user_id):
+        remaining = self._connections.get(user_id, 0) - 1
+        if remaining > 0:
+            self._connections[user_id] = remaining
+            return
+        self._connections.pop(user_id, None)
+        # A socket on another worker brings the user back online on its next heartbeat
+        await self._write([user_id], online=False)
+
+    async def touch(self, user_id):
+        """Client heartbeat frame: refresh right away"""
+        if user_id in self._connections:
+            await self._write([user_id], online=True)
+
+    async def _beat(self):
+        while self._connections:
+            await asyncio.sleep(self.heartbeat)
+            if self._connections:
+                await self._write(list(self._connections), online=True)
+
+    async def _write(self, user_ids, online):
+        now = time.time()
+        online_until = now + _timeout() if online else now
+        await _presence_cache().aset_many(
+            {_key(user_id): {'online_until': online_until, 'last_seen': now} for user_id in user_ids},
+            timeout=LAST_SEEN_TIMEOUT
+        )
@@ -0,0 +1,123 @@
+"""
+Set-based read tracking. Marking messages read costs a fixed number of
+queries however many messages are involved: receipts are inserted in bulk,
+``is_read`` is flipped with one UPDATE and the user's ``ChatReadState``
+high-water mark is advanced.
+
+Each membership's ``unread_count`` and each room's ``last_message`` are
+kept up to date here as messages are inserted, read and deleted, so room
+lists can be served without counting messages.
+"""
+from collections import Counter, defaultdict
+
+from django.db import transaction
+from django.db.models import Case, F, IntegerField, Max, Value, When
+from django.db.models.functions import Coalesce, Greatest
+
+from .models import ChatReadState, ChatRoom, Message, ReadReceipt
+
+RECEIPT_BATCH_SIZE = 1000
+
+
+def advance(user_id, room_id, message_id):
+    """Move the user's read mark in a room forward to ``message_id``; never backwards"""
+    ChatReadState.objects.bulk_create(
+        [ChatReadState(user_id=user_id, room_id=room_id)],
+        ignore_conflicts=True
+    )
+    ChatReadState.objects.filter(
+        user_id=user_id,
+        room_id=room_id,
+        last_read_message_id__lt=message_id
+    ).update(last_read_message_id=message_id)
+
+
+def add_members(room_id, user_ids):
+    """Create read states for new members; they start with nothing unread"""
+    last_id = ChatRoom.objects.filter(pk=room_id).values_list('last_message_id', flat=True).first() or 0
+    ChatReadState.objects.bulk_create(
+        [ChatReadState(user_id=user_id, room_id=room_id, last_read_message_id=last_id) for user_id in user_ids],
+        ignore_conflicts=True
+    )
+
+
+def record_new_messages(messages):
+    """
+    Update room and membership counters for freshly inserted messages:
+    one UPDATE of the room and one of its read states per room.
+    """
+    by_room = defaultdict(list)
+    for message in messages:
+        by_room[message.room_id].append(message)
+
+    for room_id, room_messages in by_room.items():
+        newest = max(room_messages, key=lambda message: message.id)
+        ChatRoom.objects.filter(pk=room_id).update(
+            last_message_id=Greatest(Coalesce(F('last_message_id'), Value(0)), Value(newest.id)),
+            updated_at=Greatest(F('updated_at'), Value(newest.timestamp))
+        )
+
+        # Everyone gets the whole batch as unread, minus what they sent themselves
+        own = Counter(message.sender_id for message in room_messages)
+        ChatReadState.objects.filter(room_id=room_id).update(
+            unread_count=F('unread_count') + len(room_messages) - Case(
+                *[When(user_id=sender_id, then=Value(count)) for sender_id, count in own.items()],
+                default=Value(0),
+                output_field=IntegerField()
+            )
+        )
+
+
+def record_deleted_message(message):
+    """Undo a deleted message's contribution to the room and membership counters"""
+    ChatReadState.objects.filter(
+        room_id=message.room_id,
+        last_read_message_id__lt=message.id,
+        unread_count__gt=0
+    ).exclude(user_id=message.sender_id).update(unread_count=F('unread_count') - 1)
+
+    last_id = Message.objects.filter(room_id=message.room_id).aggregate(last=Max('id'))['last']
+    ChatRoom.objects.filter(pk=message.room_id).update(last_message_id=last_id)
+
+
+def mark_read(user_id, room_id, message_ids=None):
+    """
+    Mark messages from other users in a room as read by ``user_id``.
+
+    Without ``message_ids`` the whole room is marked by moving the read
+    mark to the newest message; no per-message receipts are written, since
+    the mark already covers them. With ``message_ids`` a receipt is stored
+    for each one. Returns the user's read mark afterwards, which stays put
+    when the messages are older than it, or None if nothing matched.
+    """
+    others = Message.objects.filter(room_id=room_id).exclude(sender_id=user_id)
+
+    with transaction.atomic():
+        if message_ids:
+            ids = list(others.filter(id__in=message_ids).values_list('id', flat=True))
+            if not ids:
+                return None
+            ReadReceipt.objects.bulk_create(
+                [ReadReceipt(message_id=message_id, user_id=user_id) for message_id in ids],
+                ignore_conflicts=True,
+                batch_size=RECEIPT_BATCH_SIZE
+            )
+            Message.objects.filter(id__in=ids, is_read=False).update(is_read=True)
+            last_read = max(ids)
+        else:
+            last_read = others.aggregate(last=Max('id'))['last']
+            if last_read is None:
+                return None
+            others.filter(id__lte=last_read, is_read=False).update(is_read=True)
+
+        advance(user_id, room_id, last_read)
+        # The stored mark may already be past these messages; it never moves back
+        state = ChatReadState.objects.filter(user_id=user_id, room_id=room_id)
+        last_read = state.values_list('last_read_message_id', flat=True).get()
+
+        # Anything from others past the mark is still unread
+        unread = 0
+        if message_ids:
+            unread = others.filter(id__gt=last_read).count()
+        state.update(unread_count=unread)
+    return last_read
@@ -13,17 +13,32 @@ class UserSerializer(serializers.ModelSerializer):
 class MessageSerializer(serializers.ModelSerializer):
     sender_name = serializers.SerializerMethodField()
     read_by = serializers.SerializerMethodField()
+    thumbnail = serializers.SerializerMethodField()
 
     class Meta:
         model = Message
-        fields = ['id', 'room', 'sender', 'sender_name', 'content', 'file', 'timestamp', 'is_read', 'read_by']
-        read_only_fields = ['sender_name', 'read_by', 'is_read']
+        fields = ['id', 'room', 'sender', 'sender_name', 'content', 'file', 'thumbnail', 'timestamp', 'is_read', 'read_by']
+        read_only_fields = ['sender_name', 'read_by', 'is_read', 'thumbnail']
 
     def get_sender_name(self, obj):
         return f"{obj.sender.first_name} {obj.sender.last_name}" if obj.sender.first_name else obj.sender.username
 
+    def get_thumbnail(self, obj):
+        # Null until the background thumbnail job has run
+        if obj.attachment is None or not obj.attachment.thumbnail:
+            return None
+        url = obj.attachment.thumbnail.url
+        request = self.context.get('request')
+        return request.build_absolute_uri(url) if request else url
+
     def get_read_by(self, obj):
-        return [receipt.user.id for receipt in obj.read_receipts.all()]
+        # Explicit receipts plus everyone whose read mark has passed this message
+        readers = {receipt.user_id for receipt in obj.read_receipts.all()}
+        readers.update(
+            state.user_id for state in obj.room.read_states.all()
+            if state.last_read_message_id >= obj.id and state.user_id != obj.sender_id
+        )
+        return sorted(readers)
 
 class ChatRoomSerializer(serializers.ModelSerializer):
     users = UserSerializer(many=True, read_only=True)
@@ -35,7 +50,7 @@ class ChatRoomSerializer(serializers.ModelSerializer):
         fields = ['id', 'name', 'is_group', 'users', 'created_at', 'updated_at', 'last_message', 'unread_count']
 
     def get_last_message(self, obj):
-        message = obj.messages.last()
+        message = obj.last_message
         if message:
             return {
                 'id': message.id,
@@ -46,5 +61,9 @@ class ChatRoomSerializer(serializers.ModelSerializer):
         return None
 
     def get_unread_count(self, obj):
-        user = self.context['request'].user
-        return obj.messages.filter(is_read=False).exclude(sender=user).count()
\ No newline at end of file
+        # Rooms from ChatRoomViewSet come with the user's read state prefetched
+        states = getattr(obj, 'own_read_states', None)
+        if states is None:
+            user = self.context['request'].user
+            states = obj.read_states.filter(user=user)
+        return states[0].unread_count if states else 0
@@ -0,0 +1,88 @@
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from .consumers import user_group_name
+from .models import ChatReadState, ChatRoom, Message
+from . import read_state, user_search
+
+User = get_user_model()
+
+
+def _notify(group, event):
+    """Send a channel layer event once the current transaction has committed"""
+    def send():
+        channel_layer = get_channel_layer()
+        if channel_layer is not None:
+            async_to_sync(channel_layer.group_send)(group, event)
+    transaction.on_commit(send)
+
+
+@receiver(post_save, sender=ChatRoom)
+def room_saved(sender, instance, created, **kwargs):
+    if not created:
+        _notify(f'chat_{instance.pk}', {'type': 'room_changed', 'removed_user_ids': None})
+
+
+@receiver(post_delete, sender=ChatRoom)
+def room_deleted(sender, instance, **kwargs):
+    _notify(f'chat_{instance.pk}', {'type': 'room_deleted'})
+
+
+@receiver(m2m_changed, sender=ChatRoom.users.through)
+def room_members_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    """Tell open sockets about removed members so they are disconnected"""
+    if reverse:
+        # user.chatrooms.remove(...) or .clear(): ``instance`` is the user
+        if action == 'post_remove':
+            room_ids = pk_set
+        elif action == 'pre_clear':
+            room_ids = list(instance.chatrooms.values_list('pk', flat=True))
+        else:
+            return
+        for room_id in room_ids:
+            _notify(f'chat_{room_id}', {'type': 'room_changed', 'removed_user_ids': [instance.pk]})
+    elif action in ('post_remove', 'post_clear'):
+        # After a clear the removed users are unknown, so every socket re-checks
+        removed = list(pk_set) if action == 'post_remove' else None
+        _notify(f'chat_{instance.pk}', {'type': 'room_changed', 'removed_user_ids': removed})
+
+
+@receiver(m2m_changed, sender=ChatRoom.users.through)
+def sync_read_states(sender, instance, action, reverse, pk_set, **kwargs):
+    """Keep exactly one read state per membership"""
+    if action == 'post_add':
+        if reverse:
+            for room_id in pk_set:
+                read_state.add_members(room_id, [instance.pk])
+        else:
+            read_state.add_members(instance.pk, pk_set)
+    elif action == 'post_remove':
+        if reverse:
+            ChatReadState.objects.filter(user_id=instance.pk, room_id__in=pk_set).delete()
+        else:
+            ChatReadState.objects.filter(room_id=instance.pk, user_id__in=pk_set).delete()
+    elif action == 'post_clear':
+        if reverse:
+            ChatReadState.objects.filter(user_id=instance.pk).delete()
+        else:
+            ChatReadState.objects.filter(room_id=instance.pk).delete()
+
+
+@receiver(post_delete, sender=Message)
+def message_deleted(sender, instance, **kwargs):
+    read_state.record_deleted_message(instance)
+
+
+@receiver(post_save, sender=User)
+def user_saved(sender, instance, created, update_fields, **kwargs):
+    # Logins only touch last_login; nothing searched or cached by the consumer changes
+    if update_fields is not None and set(update_fields) <= {'last_login'}:
+        return
+    user_search.index_user(instance)
+    if created:
+        return
+    _notify(user_group_name(instance.pk), {'type': 'user_changed'})
@@ -1,3 +1,39 @@
+from django.contrib.auth import get_user_model
 from django.test import TestCase
 
-# Create your tests here.
+from . import read_state
+from .models import ChatReadState, ChatRoom, Message
+
+User = get_user_model()
+
+
+class MarkReadTests(TestCase):
+    def setUp(self):
+        self.reader = User.objects.create(username='reader')
+        self.sender = User.objects.create(username='sender')
+        self.room = ChatRoom.objects.create()
+        self.room.users.add(self.reader, self.sender)
+        self.messages = [
+            Message.objects.create(room=self.room, sender=self.sender, content=f"message {i}")
+            for i in range(5)
+        ]
+        read_state.record_new_messages(self.messages)
+
+    def state(self):
+        return ChatReadState.objects.get(user=self.reader, room=self.room)
+
+    def test_marking_an_older_message_keeps_the_mark(self):
+        newest = self.messages[-1].id
+        self.assertEqual(read_state.mark_read(self.reader.id, self.room.id), newest)
+
+        last_read = read_state.mark_read(self.reader.id, self.room.id, [self.messages[0].id])
+
+        self.assertEqual(last_read, newest)
+        self.assertEqual(self.state().last_read_message_id, newest)
+        self.assertEqual(self.state().unread_count, 0)
+
+    def test_marking_some_messages_counts_the_rest_as_unread(self):
+        last_read = read_state.mark_read(self.reader.id, self.room.id, [self.messages[1].id])
+
+        self.assertEqual(last_read, self.messages[1].id)
+        self.assertEqual(self.state().unread_count, 3)
@@ -0,0 +1,96 @@
+"""
+Coalesced typing indicators. Typing frames only update an in-memory
+state machine per room; each worker process publishes one aggregated
+``typing_state`` event per room at most every ``interval`` seconds, and
+only when the set of typers changes or needs refreshing.
+"""
+import asyncio
+import uuid
+import weakref
+
+from channels.layers import get_channel_layer
+from django.conf import settings
+
+# One coalescer per event loop, i.e. per worker process under daphne
+_coalescers = weakref.WeakKeyDictionary()
+
+
+def get_coalescer():
+    loop = asyncio.get_running_loop()
+    coalescer = _coalescers.get(loop)
+    if coalescer is None:
+        coalescer = TypingCoalescer(
+            interval=getattr(settings, 'CHAT_TYPING_INTERVAL', 0.3),
+            ttl=getattr(settings, 'CHAT_TYPING_TTL', 6),
+        )
+        _coalescers[loop] = coalescer
+    return coalescer
+
+
+class TypingCoalescer:
+    """
+    Tracks who is typing in each room on this worker. A typer expires
+    ``ttl`` seconds after their last typing frame. While anyone is typing
+    the state is re-published every ``ttl / 2`` seconds, so consumers can
+    expire the state of a worker that went away.
+    """
+    def __init__(self, interval=0.3, ttl=6):
+        self.interval = interval
+        self.ttl = ttl
+        # Identifies this worker's events so consumers can merge workers
+        self.origin = uuid.uuid4().hex
+        self._rooms = {}
+        self._timers = {}
+        self._channel_layer = get_channel_layer()
+
+    def update(self, room_id, user_id, username, is_typing):
+        loop = asyncio.get_running_loop()
+        typers = self._rooms.setdefault(room_id, {})
+        if is_typing:
+            changed = user_id not in typers
+            typers[user_id] = (username, loop.time() + self.ttl)
+        else:
+            changed = typers.pop(user_id, None) is not None
+
+        if changed:
+            self._schedule(room_id, self.interval)
+        elif not typers:
+            self._rooms.pop(room_id, None)
+
+    def _schedule(self, room_id, delay):
+        """Publish the room's state after ``delay``, unless an earlier publish is already due"""
+        loop = asyncio.get_running_loop()
+        due = loop.time() + delay
+        timer = self._timers.get(room_id)
+        if timer is not None:
+            if timer.when() <= due:
+                return
+            timer.cancel()
+        self._timers[room_id] = loop.call_at(due, self._publish_soon, room_id)
+
+    def _publish_soon(self, room_id):
+        self._timers.pop(room_id, None)
+        asyncio.ensure_future(self._publish(room_id))
+
+    async def _publish(self, room_id):
+        now = asyncio.get_running_loop().time()
+        typers = self._rooms.get(room_id, {})
+        for user_id in [user_id for user_id, (_, expires) in typers.items() if expires <= now]:
+            del typers[user_id]
+
+        await self._channel_layer.group_send(f'chat_{room_id}', {
+            'type': 'typing_state',
+            'origin': self.origin,
+            'ttl': self.ttl,
+            'users': [
+                {'user_id': user_id, 'username': username}
+                for user_id, (username, _) in typers.items()
+            ],
+        })
+
+        if typers:
+            # Come back when the next typer expires, or to refresh the state
+            next_expiry = min(expires for _, expires in typers.values())
+            self._schedule(room_id, max(min(next_expiry - now, self.ttl / 2), self.interval))
+        else:
+            self._rooms.pop(room_id, None)
@@ -1,11 +1,12 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from .views import ChatRoomViewSet, MessageViewSet, UserSearchViewSet
+from .views import ChatRoomViewSet, MessageViewSet, PresenceViewSet, UserSearchViewSet
 
 router = DefaultRouter()
 router.register('rooms', ChatRoomViewSet, basename='room')
 router.register('messages', MessageViewSet, basename='message')
 router.register('users', UserSearchViewSet, basename='users')
+router.register('presence', PresenceViewSet, basename='presence')
 
 urlpatterns = [
     path('', include(router.urls)),
@@ -0,0 +1,93 @@
+"""
+Ranked prefix search over users, served from ``UserSearchEntry`` so every
+lookup is an index range scan instead of a scan of the user table.
+"""
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models import Case, IntegerField, Value, When
+
+from .models import UserSearchEntry
+
+User = get_user_model()
+
+# Results per search, unless the caller asks for fewer
+SEARCH_LIMIT = 20
+MAX_SEARCH_LIMIT = 50
+
+# Fields searched, best match first
+RANKED_FIELDS = ('username', 'full_name', 'last_name', 'email')
+
+
+def entry_for(user):
+    return UserSearchEntry(
+        user_id=user.pk,
+        username=user.username.lower(),
+        full_name=f"{user.first_name} {user.last_name}".strip().lower(),
+        last_name=user.last_name.lower(),
+        email=user.email.lower(),
+    )
+
+
+def index_user(user):
+    entry = entry_for(user)
+    UserSearchEntry.objects.update_or_create(
+        user_id=user.pk,
+        defaults={
+            'username': entry.username,
+            'full_name': entry.full_name,
+            'last_name': entry.last_name,
+            'email': entry.email,
+        }
+    )
+
+
+def rebuild(batch_size=5000):
+    """
+    Re-index every user; returns the number of entries written. Runs in one
+    transaction, so searches keep seeing the old index until it commits.
+    """
+    written = 0
+    batch = []
+    with transaction.atomic():
+        UserSearchEntry.objects.all().delete()
+        for user in User.objects.only('pk', 'username', 'first_name', 'last_name', 'email').iterator(chunk_size=batch_size):
+            batch.append(entry_for(user))
+            if len(batch) >= batch_size:
+                UserSearchEntry.objects.bulk_create(batch)
+                written += len(batch)
+                batch = []
+        UserSearchEntry.objects.bulk_create(batch)
+    return written + len(batch)
+
+
+def search(query, limit=SEARCH_LIMIT):
+    """
+    Users whose username, full name, last name or email starts with
+    ``query``. Username matches come first (an exact username before any
+    longer one), then full name, last name and email matches, each ordered
+    by the matched value.
+
+    Every field is a separate index range scan that stops after ``limit``
+    rows, and later fields are only read while the result is short, so the
+    cost does not grow with the number of matching users.
+    """
+    term = ' '.join(query.split()).lower()
+    if not term:
+        return User.objects.none()
+    limit = max(1, min(limit, MAX_SEARCH_LIMIT))
+
+    user_ids = []
+    for field in RANKED_FIELDS:
+        matches = UserSearchEntry.objects.filter(
+            **{f'{field}__startswith': term}
+        ).exclude(pk__in=user_ids).order_by(field, 'pk').values_list('pk', flat=True)
+        user_ids.extend(matches[:limit - len(user_ids)])
+        if len(user_ids) >= limit:
+            break
+
+    return User.objects.filter(pk__in=user_ids).order_by(
+        Case(
+            *[When(pk=user_id, then=Value(position)) for position, user_id in enumerate(user_ids)],
+            output_field=IntegerField(),
+        )
+    )
@@ -1,20 +1,40 @@
 from django.shortcuts import render, get_object_or_404
 from django.contrib.auth import get_user_model
-from django.db.models import Q
+from django.db.models import Prefetch, Q
 from rest_framework import viewsets, permissions, status
 from rest_framework.response import Response
 from rest_framework.decorators import action
-from .models import ChatRoom, Message, ReadReceipt
+from .models import ChatReadState, ChatRoom, Message
 from .serializers import ChatRoomSerializer, MessageSerializer, UserSerializer
+from . import attachments, presence, read_state, user_search
 
 User = get_user_model()
 
+# Messages per page for keyset-paginated history
+MESSAGE_PAGE_SIZE = 50
+MAX_MESSAGE_PAGE_SIZE = 200
+
+# Room id, content and multipart framing sent alongside an attachment
+UPLOAD_OVERHEAD_BYTES = 64 * 1024
+
+# Users per bulk presence query
+MAX_PRESENCE_USERS = 200
+
 class ChatRoomViewSet(viewsets.ModelViewSet):
     serializer_class = ChatRoomSerializer
     permission_classes = [permissions.IsAuthenticated]
 
     def get_queryset(self):
-        return ChatRoom.objects.filter(users=self.request.user)
+        return ChatRoom.objects.filter(users=self.request.user).select_related(
+            'last_message__sender'
+        ).prefetch_related(
+            'users',
+            Prefetch(
+                'read_states',
+                queryset=ChatReadState.objects.filter(user=self.request.user),
+                to_attr='own_read_states'
+            )
+        )
 
     def create(self, request):
         user_ids = request.data.get('users', [])
@@ -56,19 +76,9 @@ class ChatRoomViewSet(viewsets.ModelViewSet):
     def mark_read(self, request, pk=None):
         room = self.get_object()
         message_ids = request.data.get('message_ids', [])
+        last_read = read_state.mark_read(request.user.id, room.id, message_ids)
         
-        if message_ids:
-            messages = Message.objects.filter(id__in=message_ids, room=room)
-        else:
-            messages = Message.objects.filter(room=room)
-        
-        for message in messages:
-            if message.sender != request.user:
-                ReadReceipt.objects.get_or_create(message=message, user=request.user)
-                message.is_read = True
-                message.save()
-        
-        return Response({"status": "messages marked as read"})
+        return Response({"status": "messages marked as read", "last_read_message_id": last_read})
 
 class MessageViewSet(viewsets.ModelViewSet):
     serializer_class = MessageSerializer
@@ -81,9 +91,59 @@ class MessageViewSet(viewsets.ModelViewSet):
             qs = Message.objects.filter(room_id=room_id)
             # Optionally, check that the current user is a member of the room:
             qs = qs.filter(room__users=self.request.user)
-            return qs
+            return qs.select_related('sender', 'attachment').prefetch_related('read_receipts', 'room__read_states')
         return Message.objects.none()
     
+    def list(self, request):
+        """
+        Without paging parameters every message in the room is returned.
+        With ``limit``, ``before_id`` or ``after_id`` one page is returned,
+        oldest first, using the (room, timestamp, id) index as a keyset:
+        ``before_id`` pages back through history (the latest page when
+        omitted) and ``after_id`` fetches newer messages.
+        """
+        params = request.query_params
+        if not any(key in params for key in ('limit', 'before_id', 'after_id')):
+            return super().list(request)
+        
+        try:
+            limit = min(max(int(params.get('limit', MESSAGE_PAGE_SIZE)), 1), MAX_MESSAGE_PAGE_SIZE)
+            before_id = int(params['before_id']) if params.get('before_id') else None
+            after_id = int(params['after_id']) if params.get('after_id') else None
+        except ValueError:
+            return Response({"error": "limit, before_id and after_id must be integers"},
+                            status=status.HTTP_400_BAD_REQUEST)
+        
+        queryset = self.get_queryset()
+        cursor_id = after_id if after_id is not None else before_id
+        if cursor_id is not None:
+            cursor = Message.objects.filter(
+                id=cursor_id, room_id=params.get('room')
+            ).values_list('timestamp', flat=True).first()
+            if cursor is None:
+                return Response({"error": "Unknown cursor message"}, status=status.HTTP_400_BAD_REQUEST)
+        
+        if after_id is not None:
+            queryset = queryset.filter(
+                Q(timestamp__gt=cursor) | Q(timestamp=cursor, id__gt=after_id)
+            ).order_by('timestamp', 'id')
+        else:
+            if before_id is not None:
+                queryset = queryset.filter(Q(timestamp__lt=cursor) | Q(timestamp=cursor, id__lt=before_id))
+            queryset = queryset.order_by('-timestamp', '-id')
+        
+        # One extra row tells us whether another page exists
+        messages = list(queryset[:limit + 1])
+        has_more = len(messages) > limit
+        messages = messages[:limit]
+        if after_id is None:
+            messages.reverse()
+        
+        return Response({
+            'results': self.get_serializer(messages, many=True).data,
+            'has_more': has_more,
+        })
+    
     def create(self, request):
         data = request.data.copy()
         data['sender'] = request.user.id
@@ -102,26 +162,52 @@ class MessageViewSet(viewsets.ModelViewSet):
         serializer.is_valid(raise_exception=True)
         self.perform_create(serializer)
         
-        # Update room timestamp
-        room.save()  # This triggers auto_now for updated_at
+        # Update the room's timestamp, last message and unread counters
+        read_state.record_new_messages([serializer.instance])
         
         return Response(serializer.data, status=status.HTTP_201_CREATED)
 
     @action(detail=False, methods=['post'], url_path='upload')
     def upload_file(self, request):
-        # Handle file upload using the MessageSerializer
-        data = request.data.copy()
-        data['sender'] = request.user.id
+        # Refuse oversized bodies before reading any of them
+        max_size = attachments.max_upload_size()
+        try:
+            content_length = int(request.META.get('CONTENT_LENGTH') or 0)
+        except ValueError:
+            content_length = 0
+        if content_length > max_size + UPLOAD_OVERHEAD_BYTES:
+            return Response({"error": f"Attachments are limited to {max_size} bytes"},
+                            status=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE)
+
+        # Files are streamed to disk and hashed while the body is parsed
+        handler = attachments.HashingUploadHandler(request._request)
+        request.upload_handlers = [handler]
+        data = request.data
+        if handler.too_large:
+            return Response({"error": f"Attachments are limited to {max_size} bytes"},
+                            status=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE)
+
         room_id = data.get('room')
         try:
             room = ChatRoom.objects.get(id=room_id, users=request.user)
-        except ChatRoom.DoesNotExist:
+        except (ChatRoom.DoesNotExist, ValueError):
             return Response({"error": "Room not found or you're not a member"}, 
                             status=status.HTTP_403_FORBIDDEN)
-        serializer = self.get_serializer(data=data)
-        serializer.is_valid(raise_exception=True)
-        self.perform_create(serializer)
-        room.save()
+        uploaded = request.FILES.get('file')
+        if uploaded is None:
+            return Response({"error": "No file uploaded"}, status=status.HTTP_400_BAD_REQUEST)
+
+        # Identical content is stored once and shared between messages
+        attachment = attachments.store(uploaded)
+        message = Message.objects.create(
+            room=room,
+            sender=request.user,
+            content=data.get('content', ''),
+            file=attachment.file.name,
+            attachment=attachment
+        )
+        read_state.record_new_messages([message])
+        serializer = self.get_serializer(message)
         return Response(serializer.data, status=status.HTTP_201_CREATED)
 
     def perform_create(self, serializer):
@@ -133,18 +219,41 @@ class UserSearchViewSet(viewsets.ReadOnlyModelViewSet):
     
     def get_queryset(self):
         query = self.request.query_params.get('query', '')
-        if not query:
-            return User.objects.none()
-            
-        return User.objects.filter(
-            Q(username__icontains=query) |
-            Q(first_name__icontains=query) |
-            Q(last_name__icontains=query) |
-            Q(email__icontains=query)
-        ).distinct()
+        try:
+            limit = int(self.request.query_params.get('limit', user_search.SEARCH_LIMIT))
+        except ValueError:
+            limit = user_search.SEARCH_LIMIT
+        # Ranked prefix matches, capped at user_search.MAX_SEARCH_LIMIT
+        return user_search.search(query, limit)
     
     @action(detail=False, methods=['get'])
     def search(self, request):
         queryset = self.get_queryset()
         serializer = self.get_serializer(queryset, many=True)
         return Response(serializer.data)
+
+
+class PresenceViewSet(viewsets.ViewSet):
+    """
+    Bulk presence lookup: ``?user_ids=1,2,3`` is answered from the presence
+    cache in one round trip, without touching the database.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    def list(self, request):
+        try:
+            user_ids = list(dict.fromkeys(
+                int(user_id) for user_id in request.query_params.get('user_ids', '').split(',') if user_id.strip()
+            ))
+        except ValueError:
+            return Response({"error": "user_ids must be a comma separated list of ids"},
+                            status=status.HTTP_400_BAD_REQUEST)
+        if len(user_ids) > MAX_PRESENCE_USERS:
+            return Response({"error": f"At most {MAX_PRESENCE_USERS} users per request"},
+                            status=status.HTTP_400_BAD_REQUEST)
+
+        states = presence.lookup(user_ids)
+        return Response([
+            {'user_id': user_id, **states[user_id]}
+            for user_id in user_ids
+        ])
@@ -0,0 +1,200 @@
+from collections import defaultdict
+from datetime import date as date_cls, datetime, timedelta
+
+from django.db import transaction
+from django.db.models import Count, Min, Q, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from habit.models import HabitMonth
+from pomodoro.models import PomodoroSession
+from task.models import Task
+from .models import UserDailyActivity
+
+TASK_FIELDS = ['tasks_created', 'tasks_completed']
+POMODORO_FIELDS = ['focus_minutes', 'sessions', 'sessions_completed']
+HABIT_FIELDS = ['habit_checkins']
+ALL_FIELDS = TASK_FIELDS + POMODORO_FIELDS + HABIT_FIELDS
+
+
+def _day_filter(lookup, dates=None, start=None, end=None):
+    """Build a Q restricting a date (or datetime ``__date``) lookup to a set or range"""
+    if dates is not None:
+        return Q(**{f"{lookup}__in": list(dates)})
+    return Q(**{f"{lookup}__gte": start, f"{lookup}__lte": end})
+
+
+def _month_filter(dates=None, start=None, end=None):
+    """Build a Q matching the HabitMonth rows that cover the given days"""
+    if dates is None:
+        dates = [start + timedelta(days=i) for i in range((end - start).days + 1)]
+    months = {(day.year, day.month - 1) for day in dates}
+    query = Q(pk__in=[])
+    for year, month in months:
+        query |= Q(year=year, month=month)
+    return query
+
+
+def compute(user_id=None, dates=None, start=None, end=None, fields=ALL_FIELDS):
+    """
+    Aggregate raw rows into ``{(user_id, date): {field: value}}`` for either an
+    explicit set of ``dates`` or the ``start..end`` range. One grouped query
+    per source model.
+    """
+    totals = defaultdict(lambda: dict.fromkeys(fields, 0))
+    wanted = set(dates) if dates is not None else None
+
+    def in_scope(day):
+        if wanted is not None:
+            return day in wanted
+        return start <= day <= end
+
+    if 'tasks_created' in fields or 'tasks_completed' in fields:
+        tasks = Task.objects.exclude(owner=None)
+        if user_id is not None:
+            tasks = tasks.filter(owner_id=user_id)
+
+        if 'tasks_created' in fields:
+            rows = (
+                tasks.filter(_day_filter('created_at__date', dates, start, end))
+                .annotate(day=TruncDate('created_at'))
+                .values_list('owner_id', 'day')
+                .annotate(count=Count('id'))
+            )
+            for owner_id, day, count in rows:
+                totals[(owner_id, day)]['tasks_created'] = count
+
+        if 'tasks_completed' in fields:
+            rows = (
+                tasks.filter(_day_filter('updated_at__date', dates, start, end), status='completed')
+                .annotate(day=TruncDate('updated_at'))
+                .values_list('owner_id', 'day')
+                .annotate(count=Count('id'))
+            )
+            for owner_id, day, count in rows:
+                totals[(owner_id, day)]['tasks_completed'] = count
+
+    if any(field in fields for field in POMODORO_FIELDS):
+        sessions = PomodoroSession.objects.filter(_day_filter('date', dates, start, end))
+        if user_id is not None:
+            sessions = sessions.filter(user_id=user_id)
+        rows = (
+            sessions.order_by()
+            .values_list('user_id', 'date')
+            .annotate(
+                total_focus=Sum('focus_time'),
+                total_sessions=Count('id'),
+                total_completed=Count('id', filter=Q(completed=True))
+            )
+        )
+        for session_user_id, day, focus, count, completed in rows:
+            row = totals[(session_user_id, day)]
+            row['focus_minutes'] = focus or 0
+            row['sessions'] = count
+            row['sessions_completed'] = completed
+
+    if 'habit_checkins' in fields:
+        months = HabitMonth.objects.filter(_month_filter(dates, start, end))
+        if user_id is not None:
+            months = months.filter(habit__user_id=user_id)
+        rows = months.values_list('habit__user_id', 'year', 'month', 'days')
+        for habit_user_id, year, month, days in rows.iterator():
+            for index, checked in enumerate(days or []):
+                if not checked:
+                    continue
+                try:
+                    day = date_cls(year, month + 1, index + 1)
+                except ValueError:
+                    continue
+                if in_scope(day):
+                    totals[(habit_user_id, day)]['habit_checkins'] += 1
+
+    return totals
+
+
+def refresh(user_id, dates, fields=ALL_FIELDS):
+    """
+    Recompute ``fields`` of a user's activity rows for the given days only.
+    Called from signals whenever a source row changes.
+    """
+    dates = {day for day in dates if day is not None}
+    if user_id is None or not dates:
+        return
+
+    totals = compute(user_id=user_id, dates=dates, fields=fields)
+    existing = set(
+        UserDailyActivity.objects.filter(user_id=user_id, date__in=dates)
+        .values_list('date', flat=True)
+    )
+
+    rows = []
+    for day in dates:
+        values = totals.get((user_id, day), dict.fromkeys(fields, 0))
+        # Don't materialize empty rows for days that never had activity
+        if day not in existing and not any(values.values()):
+            continue
+        rows.append(UserDailyActivity(user_id=user_id, date=day, **values))
+
+    if rows:
+        UserDailyActivity.objects.bulk_create(
+            rows,
+            update_conflicts=True,
+            unique_fields=['user', 'date'],
+            update_fields=list(fields)
+        )
+
+
+def rebuild(start, end, user_id=None, chunk_days=31, on_chunk=None):
+    """
+    Rebuild activity rows for ``start..end`` in bulk, one chunk of days per
+    transaction. ``on_chunk(chunk_start, chunk_end)`` is called after each
+    chunk commits. Returns the number of rows written.
+    """
+    written = 0
+    chunk_start = start
+    while chunk_start <= end:
+        chunk_end = min(chunk_start + timedelta(days=chunk_days - 1), end)
+
+        with transaction.atomic():
+            stale = UserDailyActivity.objects.filter(date__gte=chunk_start, date__lte=chunk_end)
+            if user_id is not None:
+                stale = stale.filter(user_id=user_id)
+            stale.delete()
+
+            totals = compute(user_id=user_id, start=chunk_start, end=chunk_end)
+            created = UserDailyActivity.objects.bulk_create(
+                (
+                    UserDailyActivity(user_id=row_user_id, date=day, **values)
+                    for (row_user_id, day), values in totals.items()
+                    if any(values.values())
+                ),
+                batch_size=1000
+            )
+        written += len(created)
+        if on_chunk is not None:
+            on_chunk(chunk_start, chunk_end)
+        chunk_start = chunk_end + timedelta(days=1)
+    return written
+
+
+def earliest_activity(user_id=None):
+    """Find the first day with any task, pomodoro or habit activity, or None"""
+    tasks = Task.objects.all()
+    sessions = PomodoroSession.objects.all()
+    months = HabitMonth.objects.all()
+    if user_id is not None:
+        tasks = tasks.filter(owner_id=user_id)
+        sessions = sessions.filter(user_id=user_id)
+        months = months.filter(habit__user_id=user_id)
+
+    first_month = months.order_by('year', 'month').values_list('year', 'month').first()
+    candidates = [
+        tasks.aggregate(first=Min('created_at'))['first'],
+        sessions.aggregate(first=Min('date'))['first'],
+        date_cls(first_month[0], first_month[1] + 1, 1) if first_month else None,
+    ]
+    days = [
+        timezone.localdate(value) if isinstance(value, datetime) else value
+        for value in candidates if value
+    ]
+    return min(days) if days else None
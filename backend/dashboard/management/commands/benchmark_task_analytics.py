@@ -0,0 +1,53 @@
+import random
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from backend import benchmarks
+from dashboard.timeseries import MAX_RANGE_DAYS, task_series
+from task.models import Task
+
+
+class Command(BaseCommand):
+    help = 'Benchmarks the task analytics time series: query count and timing per range'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--tasks', type=int, default=5000, help='Number of tasks to seed')
+        parser.add_argument(
+            '--ranges', type=int, nargs='+', default=[7, 30, 90, 180, MAX_RANGE_DAYS],
+            help='Window sizes (days) to measure'
+        )
+
+    def handle(self, *args, **options):
+        with benchmarks.rolled_back():
+            user = benchmarks.create_user()
+            self._seed(user, options['tasks'])
+            self._run(user, options['ranges'])
+
+    def _seed(self, user, count):
+        now = timezone.now()
+        statuses = ['todo', 'inprogress', 'completed']
+        tasks = Task.objects.bulk_create(
+            Task(owner=user, title=f"Task {i}", status=random.choice(statuses))
+            for i in range(count)
+        )
+        for task in tasks:
+            created = now - timedelta(days=random.randint(0, MAX_RANGE_DAYS * 2))
+            task.created_at = created
+            task.updated_at = created + timedelta(days=random.randint(0, 30))
+            task.due_date = created + timedelta(days=random.randint(-5, 60))
+        Task.objects.bulk_update(tasks, ['created_at', 'updated_at', 'due_date'], batch_size=1000)
+        self.stdout.write(f"Seeded {count} tasks")
+
+    def _run(self, user, ranges):
+        self.stdout.write(f"{'days':>6} {'queries':>8} {'ms':>10}")
+        for days in ranges:
+            with CaptureQueriesContext(connection) as queries:
+                started = time.perf_counter()
+                task_series(user, days)
+                elapsed = (time.perf_counter() - started) * 1000
+            self.stdout.write(f"{days:>6} {len(queries):>8} {elapsed:>10.1f}")
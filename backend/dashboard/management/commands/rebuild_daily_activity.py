@@ -0,0 +1,53 @@
+from datetime import datetime
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from dashboard import activity
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = 'Backfills or rebuilds UserDailyActivity rows for a date range'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--from', dest='date_from', help='First day (YYYY-MM-DD), defaults to the earliest activity')
+        parser.add_argument('--to', dest='date_to', help='Last day (YYYY-MM-DD), defaults to today')
+        parser.add_argument('--user', help='Only rebuild rows for this username')
+        parser.add_argument('--chunk-days', type=int, default=31, help='Days rebuilt per transaction')
+
+    def handle(self, *args, **options):
+        user_id = None
+        if options['user']:
+            try:
+                user_id = User.objects.get(username=options['user']).pk
+            except User.DoesNotExist:
+                raise CommandError(f"User not found: {options['user']}")
+
+        date_to = self._parse_date(options['date_to']) or timezone.localdate()
+        date_from = self._parse_date(options['date_from']) or activity.earliest_activity(user_id)
+        if date_from is None:
+            self.stdout.write('No activity to rebuild')
+            return
+        if date_from > date_to:
+            raise CommandError('--from must not be after --to')
+
+        written = activity.rebuild(
+            date_from,
+            date_to,
+            user_id=user_id,
+            chunk_days=max(1, options['chunk_days']),
+            on_chunk=lambda start, end: self.stdout.write(f"Rebuilt {start} .. {end}")
+        )
+
+        self.stdout.write(self.style.SUCCESS(f'Wrote {written} daily activity rows'))
+
+    def _parse_date(self, value):
+        if not value:
+            return None
+        try:
+            return datetime.strptime(value, '%Y-%m-%d').date()
+        except ValueError:
+            raise CommandError(f"Invalid date: {value}")
@@ -0,0 +1,52 @@
+# Generated by Django 5.2.18 on 2026-10-17 20:07
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.utils import timezone
+
+
+def backfill_daily_activity(apps, schema_editor):
+    """
+    Fill the rollup from existing history, as rebuild_daily_activity does.
+    Uses the live models through dashboard.activity, so the source apps'
+    migrations below must have run first.
+    """
+    from dashboard import activity
+
+    start = activity.earliest_activity()
+    if start is not None:
+        activity.rebuild(start, timezone.localdate())
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dashboard', '0001_initial'),
+        ('habit', '0001_initial'),
+        ('pomodoro', '0002_pomodorosession_unique_user_session'),
+        ('task', '0002_task_owner'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UserDailyActivity',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('tasks_created', models.IntegerField(default=0)),
+                ('tasks_completed', models.IntegerField(default=0)),
+                ('focus_minutes', models.IntegerField(default=0)),
+                ('sessions', models.IntegerField(default=0)),
+                ('sessions_completed', models.IntegerField(default=0)),
+                ('habit_checkins', models.IntegerField(default=0)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_activity', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['date'],
+                'constraints': [models.UniqueConstraint(fields=('user', 'date'), name='unique_user_daily_activity')],
+            },
+        ),
+        migrations.RunPython(backfill_daily_activity, migrations.RunPython.noop),
+    ]
@@ -59,3 +59,23 @@ class FeatureUsage(models.Model):
     
     class Meta:
         unique_together = ['user', 'feature']
+
+class UserDailyActivity(models.Model):
+    """Materialized per-user daily totals, maintained from task, pomodoro and habit signals"""
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='daily_activity')
+    date = models.DateField()
+    tasks_created = models.IntegerField(default=0)
+    tasks_completed = models.IntegerField(default=0)
+    focus_minutes = models.IntegerField(default=0)
+    sessions = models.IntegerField(default=0)
+    sessions_completed = models.IntegerField(default=0)
+    habit_checkins = models.IntegerField(default=0)
+
+    class Meta:
+        ordering = ['date']
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'date'], name='unique_user_daily_activity')
+        ]
+
+    def __str__(self):
+        return f"{self.user.username}'s activity on {self.date}"
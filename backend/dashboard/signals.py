@@ -0,0 +1,94 @@
+import calendar
+from datetime import date
+
+from django.db.models.signals import pre_save, post_save, post_delete
+from django.dispatch import receiver
+from django.utils import timezone
+
+from habit.models import Habit, HabitMonth
+from pomodoro.models import PomodoroSession
+from task.models import Task
+from . import activity
+from .stats import invalidate_user_stats
+
+
+def _local_date(value):
+    return timezone.localdate(value) if value else None
+
+
+@receiver(post_save, sender=Task)
+@receiver(post_delete, sender=Task)
+def invalidate_dashboard_stats(sender, instance, **kwargs):
+    """Drop the owner's cached dashboard stats whenever one of their tasks changes"""
+    invalidate_user_stats(instance.owner_id)
+
+
+@receiver(pre_save, sender=Task)
+def remember_task_state(sender, instance, **kwargs):
+    """Keep the stored owner and completion day so both old and new days get refreshed"""
+    instance._activity_previous = None
+    if instance.pk:
+        instance._activity_previous = (
+            Task.objects.filter(pk=instance.pk).values_list('owner_id', 'updated_at').first()
+        )
+
+
+@receiver(post_save, sender=Task)
+def update_activity_on_task_save(sender, instance, **kwargs):
+    days = {_local_date(instance.created_at), _local_date(instance.updated_at)}
+    previous = getattr(instance, '_activity_previous', None)
+    if previous:
+        previous_owner_id, previous_updated_at = previous
+        if previous_owner_id != instance.owner_id:
+            activity.refresh(
+                previous_owner_id,
+                {_local_date(instance.created_at), _local_date(previous_updated_at)},
+                activity.TASK_FIELDS
+            )
+        else:
+            days.add(_local_date(previous_updated_at))
+    activity.refresh(instance.owner_id, days, activity.TASK_FIELDS)
+
+
+@receiver(post_delete, sender=Task)
+def update_activity_on_task_delete(sender, instance, **kwargs):
+    activity.refresh(
+        instance.owner_id,
+        {_local_date(instance.created_at), _local_date(instance.updated_at)},
+        activity.TASK_FIELDS
+    )
+
+
+@receiver(pre_save, sender=PomodoroSession)
+def remember_session_state(sender, instance, **kwargs):
+    """Keep the stored user and day so a moved session refreshes both days"""
+    instance._activity_previous = None
+    if instance.pk:
+        instance._activity_previous = (
+            PomodoroSession.objects.filter(pk=instance.pk).values_list('user_id', 'date').first()
+        )
+
+
+@receiver(post_save, sender=PomodoroSession)
+def update_activity_on_session_save(sender, instance, **kwargs):
+    previous = getattr(instance, '_activity_previous', None)
+    if previous and previous != (instance.user_id, instance.date):
+        activity.refresh(previous[0], {previous[1]}, activity.POMODORO_FIELDS)
+    activity.refresh(instance.user_id, {instance.date}, activity.POMODORO_FIELDS)
+
+
+@receiver(post_delete, sender=PomodoroSession)
+def update_activity_on_session_delete(sender, instance, **kwargs):
+    activity.refresh(instance.user_id, {instance.date}, activity.POMODORO_FIELDS)
+
+
+@receiver(post_save, sender=HabitMonth)
+@receiver(post_delete, sender=HabitMonth)
+def update_activity_on_habit_month_change(sender, instance, **kwargs):
+    user_id = Habit.objects.filter(pk=instance.habit_id).values_list('user_id', flat=True).first()
+    try:
+        days_in_month = calendar.monthrange(instance.year, instance.month + 1)[1]
+    except (TypeError, ValueError):
+        return
+    days = {date(instance.year, instance.month + 1, day) for day in range(1, days_in_month + 1)}
+    activity.refresh(user_id, days, activity.HABIT_FIELDS)
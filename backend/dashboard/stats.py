@@ -0,0 +1,70 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db.models import Count, Q
+from django.utils import timezone
+
+from task.models import Task
+
+OPEN_STATUSES = ['todo', 'inprogress']
+
+
+def _stats_cache():
+    """Return the cache backend configured for dashboard stats"""
+    return caches[getattr(settings, 'DASHBOARD_STATS_CACHE', 'default')]
+
+
+def _cache_key(user_id, day):
+    return f"dashboard:stats:{user_id}:{day.isoformat()}"
+
+
+def compute_task_counts(user, now=None):
+    """
+    Compute every task-based dashboard card with a single conditional
+    aggregate over the user's tasks.
+    """
+    now = now or timezone.now()
+    today = now.date()
+    open_tasks = Q(status__in=OPEN_STATUSES)
+
+    return Task.objects.filter(owner=user).aggregate(
+        tasks_due_today=Count('id', filter=open_tasks & Q(due_date__date=today)),
+        projects_in_progress=Count('id', filter=Q(status='inprogress', category='project')),
+        completed_tasks=Count(
+            'id', filter=Q(status='completed', updated_at__gte=now - timedelta(days=7))
+        ),
+        upcoming_deadlines=Count(
+            'id',
+            filter=open_tasks & Q(
+                due_date__date__gt=today,
+                due_date__date__lte=today + timedelta(days=7)
+            )
+        ),
+        tasks_due_previous=Count(
+            'id', filter=open_tasks & Q(due_date__date=today - timedelta(days=30))
+        ),
+    )
+
+
+def get_task_counts(user):
+    """Return the dashboard task counts for a user, served from cache when possible"""
+    now = timezone.now()
+    cache = _stats_cache()
+    key = _cache_key(user.pk, now.date())
+
+    counts = cache.get(key)
+    if counts is None:
+        counts = compute_task_counts(user, now=now)
+        cache.set(key, counts, getattr(settings, 'DASHBOARD_STATS_CACHE_TIMEOUT', 60))
+    return counts
+
+
+def invalidate_user_stats(user_id):
+    """
+    Drop the cached dashboard counts for a user. Other workers only see
+    this when DASHBOARD_STATS_CACHE is shared between processes.
+    """
+    if user_id is None:
+        return
+    _stats_cache().delete(_cache_key(user_id, timezone.now().date()))
@@ -0,0 +1,122 @@
+from datetime import timedelta
+
+from django.db.models import Count, DateField, Value
+from django.db.models.functions import Greatest, TruncDate
+from django.utils import timezone
+
+from task.models import Task
+from .models import UserDailyActivity
+from .stats import OPEN_STATUSES
+
+DEFAULT_RANGE_DAYS = 7
+MAX_RANGE_DAYS = 365
+
+
+def parse_range(value, default=DEFAULT_RANGE_DAYS):
+    """Parse a ``timeRange`` query param, clamped to ``1..MAX_RANGE_DAYS``"""
+    try:
+        days = int(value)
+    except (TypeError, ValueError):
+        days = default
+    return max(1, min(days, MAX_RANGE_DAYS))
+
+
+def calendar(days, today=None):
+    """Return the last ``days`` dates ending today, oldest first"""
+    today = today or timezone.now().date()
+    start = today - timedelta(days=days - 1)
+    return [start + timedelta(days=i) for i in range(days)]
+
+
+def task_series(user, days, today=None):
+    """
+    Return completed, pending and overdue task counts for every day in the
+    window. Completed counts come from ``UserDailyActivity``; pending and
+    overdue depend on the current state of open tasks and use two grouped
+    queries. The query count does not depend on the window size.
+    """
+    dates = calendar(days, today)
+    start, end = dates[0], dates[-1]
+    index = {date: i for i, date in enumerate(dates)}
+    tasks = Task.objects.filter(owner=user)
+
+    # Completed: read from the daily activity rollup
+    completed = [0] * days
+    rows = UserDailyActivity.objects.filter(
+        user=user, date__gte=start, date__lte=end
+    ).values_list('date', 'tasks_completed')
+    for date, count in rows:
+        completed[index[date]] = count
+
+    # Pending: in-progress tasks whose [created, due] interval covers the day.
+    # Grouped by interval, then swept over the window with a difference array.
+    pending_delta = [0] * (days + 1)
+    rows = (
+        tasks.filter(
+            status='inprogress',
+            created_at__date__lte=end,
+            due_date__date__gte=start
+        )
+        .annotate(created_day=TruncDate('created_at'), due_day=TruncDate('due_date'))
+        .values('created_day', 'due_day')
+        .annotate(count=Count('id'))
+    )
+    for row in rows:
+        first = max(row['created_day'], start)
+        last = min(row['due_day'], end)
+        if first > last:
+            continue
+        pending_delta[index[first]] += row['count']
+        pending_delta[index[last] + 1] -= row['count']
+
+    # Overdue: open tasks due before the day. Everything due before the
+    # window is folded into a single bucket on the day before it starts.
+    overdue_delta = [0] * (days + 1)
+    rows = (
+        tasks.filter(status__in=OPEN_STATUSES, due_date__date__lt=end)
+        .annotate(day=Greatest(
+            TruncDate('due_date'),
+            Value(start - timedelta(days=1), output_field=DateField())
+        ))
+        .values('day')
+        .annotate(count=Count('id'))
+    )
+    for row in rows:
+        # A task due on day d is overdue from d + 1 onwards
+        first = row['day'] + timedelta(days=1)
+        if first in index:
+            overdue_delta[index[first]] += row['count']
+
+    series = []
+    pending = overdue = 0
+    for i, date in enumerate(dates):
+        pending += pending_delta[i]
+        overdue += overdue_delta[i]
+        series.append({
+            'date': date,
+            'completed': completed[i],
+            'pending': pending,
+            'overdue': overdue,
+        })
+    return series
+
+
+def pomodoro_series(user, days, today=None):
+    """
+    Return focus minutes and completed sessions for every day in the window
+    from the daily activity rollup.
+    """
+    dates = calendar(days, today)
+    rows = UserDailyActivity.objects.filter(
+        user=user, date__gte=dates[0], date__lte=dates[-1]
+    ).values_list('date', 'focus_minutes', 'sessions_completed')
+
+    by_day = {date: (focus_minutes, completed) for date, focus_minutes, completed in rows}
+    return [
+        {
+            'date': date,
+            'focus_time': by_day.get(date, (0, 0))[0],
+            'sessions_completed': by_day.get(date, (0, 0))[1],
+        }
+        for date in dates
+    ]
@@ -5,10 +5,12 @@ from rest_framework.permissions import IsAuthenticated
 from rest_framework.decorators import api_view, permission_classes
 from django.utils import timezone
 from datetime import timedelta, datetime
-from django.db.models import Count, Sum, Avg
+from django.db.models import Sum, Avg
 
-from .models import DashboardStat, RecentActivity, FeatureUsage
+from .models import DashboardStat, RecentActivity, FeatureUsage, UserDailyActivity
 from .serializers import DashboardStatSerializer, RecentActivitySerializer
+from .stats import get_task_counts
+from .timeseries import parse_range, task_series, pomodoro_series
 from task.models import Task
 from pomodoro.models import PomodoroSession
 from habit.models import Habit
@@ -23,68 +25,18 @@ class DashboardStatsView(APIView):
         try:
             user = request.user
             
-            # Calculate real statistics
-            today = timezone.now().date()
-            
-            # 1. Tasks due today
-            try:
-                tasks_due_today = Task.objects.filter(
-                    owner=user,
-                    due_date__date=today,
-                    status__in=['todo', 'inprogress']
-                ).count()
-            except Exception as e:
-                print(f"Error counting tasks due today: {e}")
-                tasks_due_today = 0
-            
-            # 2. Projects in progress
-            try:
-                projects_in_progress = Task.objects.filter(
-                    owner=user,
-                    status='inprogress',
-                    category='project'
-                ).count()
-            except Exception as e:
-                print(f"Error counting projects: {e}")
-                projects_in_progress = 0
-            
-            # 3. Completed tasks (in the last 7 days)
-            try:
-                completed_tasks = Task.objects.filter(
-                    owner=user,
-                    status='completed',
-                    updated_at__gte=timezone.now() - timedelta(days=7)
-                ).count()
-            except Exception as e:
-                print(f"Error counting completed tasks: {e}")
-                completed_tasks = 0
-            
-            # 4. Upcoming deadlines (next 7 days)
-            try:
-                upcoming_deadlines = Task.objects.filter(
-                    owner=user,
-                    due_date__date__gt=today,
-                    due_date__date__lte=today + timedelta(days=7),
-                    status__in=['todo', 'inprogress']
-                ).count()
-            except Exception as e:
-                print(f"Error counting upcoming deadlines: {e}")
-                upcoming_deadlines = 0
+            # All task cards come from one conditional aggregate (cached per user)
+            counts = get_task_counts(user)
+            tasks_due_today = counts['tasks_due_today']
+            projects_in_progress = counts['projects_in_progress']
+            completed_tasks = counts['completed_tasks']
+            upcoming_deadlines = counts['upcoming_deadlines']
             
             # Calculate trends (percent change from previous period)
             tasks_trend = 0
-            try:
-                previous_period = today - timedelta(days=30)
-                tasks_due_previous = Task.objects.filter(
-                    owner=user,
-                    due_date__date=previous_period,
-                    status__in=['todo', 'inprogress']
-                ).count()
-                
-                if tasks_due_previous > 0:
-                    tasks_trend = int(((tasks_due_today - tasks_due_previous) / tasks_due_previous) * 100)
-            except Exception as e:
-                print(f"Error calculating trends: {e}")
+            tasks_due_previous = counts['tasks_due_previous']
+            if tasks_due_previous > 0:
+                tasks_trend = int(((tasks_due_today - tasks_due_previous) / tasks_due_previous) * 100)
             
             # Construct stats array
             stats = [
@@ -246,50 +198,17 @@ class TaskAnalyticsView(APIView):
     def get(self, request):
         """Return task completion analytics data"""
         user = request.user
-        time_range = request.query_params.get('timeRange', '7')
-        
-        try:
-            days = int(time_range)
-        except ValueError:
-            days = 7
-            
-        # Generate date labels for the last N days
-        dates = []
-        date_labels = []
-        data = []
+        days = parse_range(request.query_params.get('timeRange', '7'))
         
-        for i in range(days-1, -1, -1):
-            date = timezone.now().date() - timedelta(days=i)
-            dates.append(date)
-            date_labels.append(date.strftime("%a"))
-            
-        # Get task data for each day
-        for date in dates:
-            completed = Task.objects.filter(
-                owner=user,
-                status='completed',
-                updated_at__date=date
-            ).count()
-            
-            pending = Task.objects.filter(
-                owner=user,
-                status='inprogress',
-                created_at__date__lte=date,
-                due_date__date__gte=date
-            ).count()
-            
-            overdue = Task.objects.filter(
-                owner=user,
-                status__in=['todo', 'inprogress'],
-                due_date__date__lt=date
-            ).count()
-            
-            data.append({
-                "day": date.strftime("%a"),
-                "completed": completed,
-                "pending": pending,
-                "overdue": overdue
-            })
+        data = [
+            {
+                "day": point['date'].strftime("%a"),
+                "completed": point['completed'],
+                "pending": point['pending'],
+                "overdue": point['overdue']
+            }
+            for point in task_series(user, days)
+        ]
             
         return Response(data)
 
@@ -300,42 +219,16 @@ class PomodoroStatsView(APIView):
     def get(self, request):
         """Return pomodoro focus time tracking data"""
         user = request.user
-        time_range = request.query_params.get('timeRange', '7')
-        
-        try:
-            days = int(time_range)
-        except ValueError:
-            days = 7
-            
-        # Generate date labels for the last N days
-        dates = []
-        date_labels = []
-        data = []
+        days = parse_range(request.query_params.get('timeRange', '7'))
         
-        for i in range(days-1, -1, -1):
-            date = timezone.now().date() - timedelta(days=i)
-            dates.append(date)
-            date_labels.append(date.strftime("%a"))
-            
-        # Get pomodoro data for each day
-        for date in dates:
-            # Get all sessions for this day
-            sessions = PomodoroSession.objects.filter(
-                user=user,
-                date=date
-            )
-            
-            # Calculate total focus time
-            focus_time = sessions.aggregate(total=Sum('focus_time'))['total'] or 0
-            
-            # Count completed sessions
-            sessions_completed = sessions.filter(completed=True).count()
-            
-            data.append({
-                "day": date.strftime("%a"),
-                "focusTime": focus_time,
-                "sessionsCompleted": sessions_completed
-            })
+        data = [
+            {
+                "day": point['date'].strftime("%a"),
+                "focusTime": point['focus_time'],
+                "sessionsCompleted": point['sessions_completed']
+            }
+            for point in pomodoro_series(user, days)
+        ]
             
         return Response(data)
 
@@ -504,15 +397,15 @@ class InsightsView(APIView):
         
     def _get_most_productive_day(self, user):
         """Calculate the user's most productive day based on task completion"""
-        from django.db.models.functions import Extract
+        from django.db.models.functions import ExtractWeekDay
         
-        productive_days = Task.objects.filter(
-            owner=user,
-            status='completed'
+        productive_days = UserDailyActivity.objects.filter(
+            user=user,
+            tasks_completed__gt=0
         ).annotate(
-            weekday=Extract('updated_at', 'week_day')
+            weekday=ExtractWeekDay('date')
         ).values('weekday').annotate(
-            count=Count('id')
+            count=Sum('tasks_completed')
         ).order_by('-count')
         
         if productive_days:
@@ -530,12 +423,12 @@ class InsightsView(APIView):
         
     def _get_focus_peak(self, user):
         """Analyze pomodoro sessions to find the user's peak focus time"""
-        sessions = PomodoroSession.objects.filter(
+        has_sessions = UserDailyActivity.objects.filter(
             user=user,
-            completed=True
-        )
+            sessions_completed__gt=0
+        ).exists()
         
-        if not sessions:
+        if not has_sessions:
             return {
                 'start': '9:00 AM',
                 'end': '11:00 AM'
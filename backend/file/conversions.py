@@ -0,0 +1,137 @@
+"""
+Conversion dispatch shared by the synchronous convert view and the
+background conversion jobs.
+"""
+import os
+
+from django.conf import settings
+
+from .converters import html_to_pdf, img_to_pdf, pdf_to_img, pdf_to_pptx, pdf_to_word, word_to_pdf
+
+PDF = "application/pdf"
+DOCX = "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
+PPTX = "application/vnd.openxmlformats-officedocument.presentationml.presentation"
+
+CONTENT_TYPES = {
+    ".pdf": PDF,
+    ".docx": DOCX,
+    ".pptx": PPTX,
+    ".png": "image/png",
+    ".jpg": "image/jpeg",
+    ".webp": "image/webp",
+    ".zip": "application/zip",
+}
+
+# conversion_type -> (converter, output extension)
+CONVERTERS = {
+    "image_to_pdf": (img_to_pdf.convert_img_to_pdf, ".pdf"),
+    "pdf_to_word": (pdf_to_word.convert_pdf_to_word, ".docx"),
+    "html_to_pdf": (html_to_pdf.convert_html_to_pdf, ".pdf"),
+    "pdf_to_pptx": (pdf_to_pptx.convert_pdf_to_pptx, ".pptx"),
+    "word_to_pdf": (word_to_pdf.convert_word_to_pdf, ".pdf"),
+}
+
+SUPPORTED_TYPES = set(CONVERTERS) | {"pdf_to_img"}
+
+
+def parse_options(conversion_type, data):
+    """
+    Read converter options from request data. Returns the options dict,
+    which also goes into the result cache key; raises ValueError.
+    """
+    if conversion_type != "pdf_to_img":
+        return {}
+
+    try:
+        dpi = int(data.get("dpi") or pdf_to_img.DEFAULT_DPI)
+    except ValueError:
+        raise ValueError("dpi must be a number")
+    if not pdf_to_img.MIN_DPI <= dpi <= pdf_to_img.MAX_DPI:
+        raise ValueError(f"dpi must be between {pdf_to_img.MIN_DPI} and {pdf_to_img.MAX_DPI}")
+
+    image_format = (data.get("image_format") or "png").lower()
+    if image_format == "jpg":
+        image_format = "jpeg"
+    if image_format not in pdf_to_img.FORMATS:
+        raise ValueError(f"image_format must be one of {', '.join(pdf_to_img.FORMATS)}")
+
+    pages = (data.get("pages") or "").replace(" ", "")
+    # Checked against the page count once the PDF is opened
+    pdf_to_img.parse_pages(pages, 10 ** 6)
+    return {"dpi": dpi, "image_format": image_format, "pages": pages}
+
+
+def output_extensions(conversion_type, options=None):
+    """Extensions a conversion's output can have"""
+    if conversion_type == "pdf_to_img":
+        image_format = (options or {}).get("image_format", "png")
+        return (pdf_to_img.FORMATS[image_format][0], ".zip")
+    return (CONVERTERS[conversion_type][1],)
+
+
+def stream_archive(conversion_type, input_path, options=None):
+    """
+    Return a generator of ZIP chunks for conversions whose output is a
+    multi-file archive, rendered while it is sent, or None when the output
+    is a single file that has to be converted up front.
+    """
+    if conversion_type != "pdf_to_img":
+        return None
+    options = options or {}
+    page_indexes = pdf_to_img.select_pages(input_path, options.get("pages"))
+    if len(page_indexes) < 2:
+        return None
+    return pdf_to_img.iter_pdf_to_img_zip(
+        input_path,
+        page_indexes,
+        dpi=options.get("dpi", pdf_to_img.DEFAULT_DPI),
+        image_format=options.get("image_format", "png"),
+        workers=getattr(settings, "FILE_RASTER_WORKERS", None)
+    )
+
+
+def describe_output(input_name, output_path):
+    """Return ``(download filename, content type)`` for a conversion output"""
+    filename = os.path.splitext(os.path.basename(input_name))[0]
+    extension = os.path.splitext(output_path)[1].lower()
+    return f"{filename}{extension}", CONTENT_TYPES.get(extension, "application/octet-stream")
+
+
+def convert(conversion_type, input_path, output_dir, options=None, progress=None):
+    """
+    Convert ``input_path`` into ``output_dir`` and return
+    ``(output_path, output_filename, content_type)``. ``options`` comes from
+    ``parse_options``; ``progress`` is called with a percentage as the
+    conversion advances.
+    """
+    if conversion_type not in SUPPORTED_TYPES:
+        raise ValueError(f"Unsupported conversion type: {conversion_type}")
+    filename = os.path.splitext(os.path.basename(input_path))[0]
+
+    if conversion_type == "pdf_to_img":
+        # A single page comes back as one image, several pages as a ZIP
+        output_path = pdf_to_img.convert_pdf_to_img(
+            input_path,
+            os.path.join(output_dir, filename),
+            workers=getattr(settings, "FILE_RASTER_WORKERS", None),
+            **(options or {})
+        )
+    elif conversion_type == "pdf_to_word":
+        output_path = os.path.join(output_dir, f"{filename}.docx")
+        pdf_to_word.convert_pdf_to_word(
+            input_path,
+            output_path,
+            workers=getattr(settings, "FILE_DOCX_WORKERS", None),
+            progress=progress
+        )
+    else:
+        converter, extension = CONVERTERS[conversion_type]
+        output_path = os.path.join(output_dir, f"{filename}{extension}")
+        converter(input_path, output_path)
+
+    if not isinstance(output_path, str) or not os.path.exists(output_path):
+        raise RuntimeError("Conversion did not produce an output file")
+    if progress is not None:
+        progress(100)
+
+    return (output_path,) + describe_output(input_path, output_path)
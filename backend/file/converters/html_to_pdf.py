@@ -1,4 +1,3 @@
-import os
 from reportlab.pdfgen import canvas
 from reportlab.lib.pagesizes import letter
 
@@ -69,17 +68,8 @@ def convert_html_to_pdf(input_path, output_path):
         except Exception as e:
             print(f"reportlab HTML parsing failed: {e}")
             
-        # Ultra fallback
-        c = canvas.Canvas(output_path)
-        c.drawString(30, 750, "HTML to PDF conversion failed.")
-        c.drawString(30, 730, f"Original file: {os.path.basename(input_path)}")
-        c.save()
-        return True
+        raise RuntimeError("Could not convert the HTML file to PDF")
         
     except Exception as e:
         print(f"All HTML to PDF conversion methods failed: {e}")
-        
-        # Create minimal valid PDF
-        with open(output_path, 'wb') as f:
-            f.write(b'%PDF-1.4\n%\xe2\xe3\xcf\xd3\n1 0 obj\n<</Type/Catalog/Pages 2 0 R>>\nendobj\n2 0 obj\n<</Type/Pages/Kids[3 0 R]/Count 1>>\nendobj\n3 0 obj\n<</Type/Page/MediaBox[0 0 612 792]/Parent 2 0 R/Resources<<>>>>\nendobj\nxref\n0 4\n0000000000 65535 f\n0000000015 00000 n\n0000000060 00000 n\n0000000111 00000 n\ntrailer\n<</Size 4/Root 1 0 R>>\nstartxref\n190\n%%EOF\n')
-        return True
+        raise
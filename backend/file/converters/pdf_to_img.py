@@ -1,67 +1,229 @@
-import fitz  # PyMuPDF
+import io
+import multiprocessing
 import os
 import zipfile
+from concurrent.futures import ProcessPoolExecutor
+
+import fitz  # PyMuPDF
 from PIL import Image
-import io
-from reportlab.lib.pagesizes import letter
-from reportlab.pdfgen import canvas
-
-def convert_pdf_to_img(input_path, output_dir):
-    """Convert PDF to image(s)."""
-    try:
-        from pdf2image import convert_from_path
-        
-        # Check if output_dir is a file path and convert to directory path
-        if not os.path.isdir(output_dir):
-            output_dir_name = os.path.splitext(output_dir)[0]
-            os.makedirs(output_dir_name, exist_ok=True)
-            output_dir = output_dir_name
-        else:
-            os.makedirs(output_dir, exist_ok=True)
-        
-        # Open the PDF
-        pdf_document = fitz.open(input_path)
-        
-        # If single page, return just an image
-        if pdf_document.page_count == 1:
-            page = pdf_document[0]
-            pix = page.get_pixmap(matrix=fitz.Matrix(2, 2))  # 2x zoom for better quality
-            
-            # Determine output path
-            base_name = os.path.basename(input_path)
-            base_name_no_ext = os.path.splitext(base_name)[0]
-            output_path = os.path.join(output_dir, f"{base_name_no_ext}.png")
-            
-            # Save the image
-            pix.save(output_path)
-            return output_path
-            
-        # If multiple pages, create a ZIP file with all images
-        else:
-            zip_path = f"{output_dir}.zip"
-            with zipfile.ZipFile(zip_path, 'w') as zip_file:
-                for page_num, page in enumerate(pdf_document):
-                    pix = page.get_pixmap(matrix=fitz.Matrix(2, 2))
-                    img_bytes = pix.tobytes("png")
-                    
-                    # Add the image to the ZIP
-                    img_filename = f"page_{page_num+1}.png"
-                    zip_file.writestr(img_filename, img_bytes)
-                    
-            return zip_path
-            
-    except Exception as e:
-        print(f"Error converting PDF to image: {e}")
-        
-        # Fallback - create a placeholder image
+
+# image_format -> (file extension, Pillow format)
+FORMATS = {
+    "png": (".png", "PNG"),
+    "jpeg": (".jpg", "JPEG"),
+    "webp": (".webp", "WEBP"),
+}
+
+DEFAULT_DPI = 144  # 2x zoom, what every page used to be rendered at
+MIN_DPI = 36
+MAX_DPI = 600
+
+# Pages rendered per task; small enough to keep workers evenly loaded and
+# the in-order reassembly buffer short
+PAGES_PER_TASK = 4
+
+# Each worker process keeps its own open document
+_document = None
+_document_path = None
+
+
+def parse_pages(spec, page_count):
+    """
+    Turn a page selection like ``"1-3,5,8-"`` (1-based, inclusive) into a
+    sorted list of 0-based page indexes. An empty spec selects every page.
+    """
+    if not spec or not spec.strip():
+        return list(range(page_count))
+
+    selected = set()
+    for part in spec.split(","):
+        part = part.strip()
+        if not part:
+            continue
         try:
-            # Create a blank image with text
-            img = Image.new('RGB', (800, 600), color = (255, 255, 255))
-            from PIL import ImageDraw, ImageFont
-            d = ImageDraw.Draw(img)
-            d.text((10,10), "PDF conversion to image failed.", fill=(0,0,0))
-            d.text((10,30), f"Original file: {os.path.basename(input_path)}", fill=(0,0,0))
-            img.save(output_dir)
-            return True
-        except:
-            raise e
\ No newline at end of file
+            if "-" in part:
+                first, last = part.split("-", 1)
+                first = int(first) if first.strip() else 1
+                last = int(last) if last.strip() else page_count
+            else:
+                first = last = int(part)
+        except ValueError:
+            raise ValueError(f"Invalid page range: {part}")
+        if first > last:
+            raise ValueError(f"Invalid page range: {part}")
+        if first < 1 or last > page_count:
+            raise ValueError(f"Page range {part} is outside 1-{page_count}")
+        selected.update(range(first - 1, last))
+    return sorted(selected)
+
+
+def _open(input_path):
+    global _document, _document_path
+    if _document_path != input_path:
+        if _document is not None:
+            _document.close()
+        _document = fitz.open(input_path)
+        _document_path = input_path
+    return _document
+
+
+def render_page(document, page_index, dpi, image_format):
+    pix = document[page_index].get_pixmap(dpi=dpi, alpha=False)
+    if image_format == "png":
+        return pix.tobytes("png")
+    image = Image.frombytes("RGB", (pix.width, pix.height), pix.samples)
+    output = io.BytesIO()
+    image.save(output, FORMATS[image_format][1], quality=90)
+    return output.getvalue()
+
+
+def _render_range(input_path, page_indexes, dpi, image_format):
+    """Render a batch of pages in a worker process"""
+    document = _open(input_path)
+    return [render_page(document, page_index, dpi, image_format) for page_index in page_indexes]
+
+
+def render_pages(input_path, page_indexes, dpi=DEFAULT_DPI, image_format="png", workers=None):
+    """
+    Yield ``(page_index, image_bytes)`` for the given pages, in order. With
+    more than one worker, batches of pages are rendered concurrently in
+    separate processes and handed back as soon as every earlier page is
+    done; at most two batches per worker are in flight at a time.
+    """
+    workers = min(workers or os.cpu_count() or 1, -(-len(page_indexes) // PAGES_PER_TASK))
+    if workers <= 1:
+        document = fitz.open(input_path)
+        try:
+            for page_index in page_indexes:
+                yield page_index, render_page(document, page_index, dpi, image_format)
+        finally:
+            document.close()
+        return
+
+    batches = [page_indexes[i:i + PAGES_PER_TASK] for i in range(0, len(page_indexes), PAGES_PER_TASK)]
+    # Spawned, so workers never inherit the caller's DB connections or threads
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as executor:
+        pending = []
+        next_batch = 0
+        try:
+            while next_batch < len(batches) or pending:
+                while next_batch < len(batches) and len(pending) < workers * 2:
+                    pending.append((
+                        batches[next_batch],
+                        executor.submit(_render_range, input_path, batches[next_batch], dpi, image_format)
+                    ))
+                    next_batch += 1
+                batch, future = pending.pop(0)
+                for page_index, image_bytes in zip(batch, future.result()):
+                    yield page_index, image_bytes
+        finally:
+            # The caller stopped early: don't render pages nobody will read
+            for _, future in pending:
+                future.cancel()
+
+
+class _ChunkBuffer(io.RawIOBase):
+    """
+    ZipFile target that only holds the bytes not yet handed out. ZipFile
+    seeks back to patch each local header once its entry is written, which
+    never reaches past the current chunk, so it can treat this as seekable
+    and entries don't need trailing data descriptors.
+    """
+    def __init__(self):
+        self._buffer = io.BytesIO()
+        self._offset = 0
+
+    def writable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def write(self, data):
+        return self._buffer.write(data)
+
+    def tell(self):
+        return self._offset + self._buffer.tell()
+
+    def seek(self, position, whence=io.SEEK_SET):
+        if whence != io.SEEK_SET or position < self._offset:
+            raise io.UnsupportedOperation("Can only seek within the current chunk")
+        self._buffer.seek(position - self._offset)
+        return position
+
+    def take(self):
+        data = self._buffer.getvalue()
+        self._offset += len(data)
+        self._buffer = io.BytesIO()
+        return data
+
+
+def iter_zip(entries):
+    """
+    Yield a ZIP archive of ``(name, data)`` entries as it is written, one
+    chunk per entry and a last one with the central directory. Entries are
+    STORED: PNG, JPEG and WebP data doesn't compress any further.
+    """
+    buffer = _ChunkBuffer()
+    with zipfile.ZipFile(buffer, "w", compression=zipfile.ZIP_STORED) as archive:
+        for name, data in entries:
+            archive.writestr(name, data)
+            yield buffer.take()
+    yield buffer.take()
+
+
+def select_pages(input_path, pages=None):
+    """Return the 0-based page indexes a ``pages`` selection picks from the PDF"""
+    with fitz.open(input_path) as pdf_document:
+        return parse_pages(pages, pdf_document.page_count)
+
+
+def iter_pdf_to_img_zip(input_path, page_indexes, dpi=DEFAULT_DPI, image_format="png", workers=None):
+    """
+    Yield a ZIP of the rendered pages chunk by chunk. Each page's entry is
+    yielded as soon as it and every page before it are rendered, so nothing
+    waits for the whole document.
+    """
+    extension = FORMATS[image_format][0]
+    return iter_zip(
+        (f"page_{page_index + 1}{extension}", image_bytes)
+        for page_index, image_bytes in render_pages(input_path, page_indexes, dpi, image_format, workers)
+    )
+
+
+def convert_pdf_to_img(input_path, output_dir, dpi=DEFAULT_DPI, image_format="png", pages=None, workers=None):
+    """
+    Convert PDF pages to images. A single selected page is written as one
+    image next to ``output_dir``; several pages go into ``<output_dir>.zip``
+    as ``page_<n>`` entries. ``pages`` is a selection like ``"1-3,5"``.
+    """
+    if image_format not in FORMATS:
+        raise ValueError(f"Unsupported image format: {image_format}")
+    if not MIN_DPI <= dpi <= MAX_DPI:
+        raise ValueError(f"DPI must be between {MIN_DPI} and {MAX_DPI}")
+    extension = FORMATS[image_format][0]
+
+    # Check if output_dir is a file path and convert to directory path
+    if not os.path.isdir(output_dir):
+        output_dir = os.path.splitext(output_dir)[0]
+    os.makedirs(output_dir, exist_ok=True)
+
+    page_indexes = select_pages(input_path, pages)
+    if not page_indexes:
+        raise ValueError("No pages selected")
+
+    # A single page is returned as just an image
+    if len(page_indexes) == 1:
+        base_name_no_ext = os.path.splitext(os.path.basename(input_path))[0]
+        output_path = os.path.join(output_dir, f"{base_name_no_ext}{extension}")
+        for _, image_bytes in render_pages(input_path, page_indexes, dpi, image_format, workers=1):
+            with open(output_path, "wb") as output:
+                output.write(image_bytes)
+        return output_path
+
+    # Several pages: the same archive the streaming response sends
+    zip_path = f"{output_dir}.zip"
+    with open(zip_path, "wb") as output:
+        for chunk in iter_pdf_to_img_zip(input_path, page_indexes, dpi, image_format, workers):
+            output.write(chunk)
+    return zip_path
@@ -84,16 +84,5 @@ def convert_pdf_to_pptx(input_path, output_path):
     except Exception as e:
         print(f"Error converting PDF to PowerPoint: {e}")
         
-        # Even simpler fallback
-        try:
-            prs = Presentation()
-            slide = prs.slides.add_slide(prs.slide_layouts[6])  # Blank slide
-            left = top = Inches(1)
-            width = height = Inches(8)
-            txBox = slide.shapes.add_textbox(left, top, width, height)
-            tf = txBox.text_frame
-            tf.text = "PDF to PowerPoint conversion failed."
-            prs.save(output_path)
-            return True
-        except:
-            raise e
+        # No placeholder deck: a failure must not look like a converted file
+        raise
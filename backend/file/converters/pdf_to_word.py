@@ -1,6 +1,8 @@
+import multiprocessing
 import os
 import platform
 import subprocess
+from concurrent.futures import ProcessPoolExecutor, as_completed
 import fitz
 from docx import Document
 from docx.shared import Pt, Inches
@@ -9,23 +11,87 @@ import tempfile
 import pytesseract
 from pdf2docx import Converter
 
-def convert_pdf_to_word(input_path, output_path):
-    """Convert PDF to Word document using pdf2docx library."""
+# Smallest page range worth a process of its own. A spawned worker takes
+# 0.6-2s to start and import pdf2docx, while parsing costs from under 0.01s
+# (sparse text) to about 0.2s (dense text) per page, so ranges much shorter
+# than this finish later in parallel than they would in one pass.
+MIN_PAGES_PER_CHUNK = 50
+
+
+def chunk_ranges(page_count, workers):
+    """
+    Split ``page_count`` pages into contiguous ``(start, end)`` ranges, two
+    per worker so progress moves in smaller steps and a slow chunk doesn't
+    leave the other workers idle.
+    """
+    chunks = max(1, min(workers * 2, page_count // MIN_PAGES_PER_CHUNK))
+    size, extra = divmod(page_count, chunks)
+    ranges, start = [], 0
+    for i in range(chunks):
+        end = start + size + (1 if i < extra else 0)
+        ranges.append((start, end))
+        start = end
+    return ranges
+
+
+def _parse_range(input_path, start, end):
+    """Parse pages ``start:end`` in a worker process and return their layout"""
+    cv = Converter(input_path)
+    try:
+        cv.parse(start, end, **cv.default_settings)
+        return cv.store()
+    finally:
+        cv.close()
+
+
+def _convert_in_chunks(input_path, output_path, ranges, workers, progress=None):
+    """
+    Parse page ranges concurrently, then build the DOCX from their layouts
+    in page order. The layouts are pdf2docx's own serialized pages, so the
+    document comes out as if it had been converted in one go, apart from
+    header/footer detection, which only sees one chunk at a time.
+    """
+    cv = Converter(input_path)
     try:
-        # Use pdf2docx which handles text, layout and basic formatting
-        cv = Converter(input_path)
-        cv.convert(output_path)
+        settings = cv.default_settings
+        cv.load_pages()
+        # Spawned, so workers never inherit the caller's DB connections or threads
+        with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as executor:
+            futures = [executor.submit(_parse_range, input_path, start, end) for start, end in ranges]
+            for done, future in enumerate(as_completed(futures), start=1):
+                cv.restore(future.result())
+                if progress is not None:
+                    # Building the document is the last tenth or so
+                    progress(90 * done / len(futures))
+        cv.make_docx(output_path, **settings)
+    finally:
         cv.close()
+
+
+def convert_pdf_to_word(input_path, output_path, workers=None, progress=None):
+    """
+    Convert PDF to Word document using pdf2docx library. Long documents are
+    parsed in page ranges on up to ``workers`` processes (default: one per
+    CPU); ``progress`` is called with a percentage as each range finishes.
+    """
+    try:
+        with fitz.open(input_path) as pdf_document:
+            page_count = pdf_document.page_count
+        # More processes than cores only adds start-up cost
+        cpus = os.cpu_count() or 1
+        workers = min(workers or cpus, cpus)
+        ranges = chunk_ranges(page_count, workers)
+
+        if workers > 1 and len(ranges) > 1:
+            _convert_in_chunks(input_path, output_path, ranges, min(workers, len(ranges)), progress)
+        else:
+            # Use pdf2docx which handles text, layout and basic formatting
+            cv = Converter(input_path)
+            cv.convert(output_path)
+            cv.close()
         return True
     except Exception as e:
         print(f"Error converting PDF to Word: {e}")
         
-        # Simple fallback - create a basic docx file
-        try:
-            from docx import Document
-            doc = Document()
-            doc.add_paragraph("PDF conversion failed. Please try again with a different file.")
-            doc.save(output_path)
-            return True
-        except:
-            raise
\ No newline at end of file
+        # No placeholder document: a failure must not look like a converted file
+        raise
@@ -159,50 +159,4 @@ def convert_word_to_pdf(input_path, output_path):
         except Exception as second_error:
             print(f"Basic text extraction failed: {second_error}")
             
-            # Create a simple PDF with error information
-            try:
-                c = canvas.Canvas(output_path, pagesize=letter)
-                c.setFont("Helvetica", 12)
-                
-                y = 750
-                c.drawString(72, y, "Word Document Conversion Result")
-                y -= 36
-                
-                c.setFont("Helvetica", 10)
-                c.drawString(72, y, "The Word document could not be fully converted to PDF format.")
-                y -= 14
-                c.drawString(72, y, f"File: {os.path.basename(input_path)}")
-                y -= 24
-                
-                c.drawString(72, y, "This PDF contains information about the Word document:")
-                y -= 20
-                
-                # File information
-                import datetime
-                file_size = os.path.getsize(input_path)
-                file_date = datetime.datetime.fromtimestamp(os.path.getmtime(input_path))
-                
-                c.drawString(90, y, f"Size: {file_size/1024:.2f} KB")
-                y -= 14
-                c.drawString(90, y, f"Modified: {file_date}")
-                y -= 24
-                
-                c.drawString(72, y, "Possible reasons for conversion failure:")
-                y -= 14
-                c.drawString(90, y, "• Document is password protected or encrypted")
-                y -= 14
-                c.drawString(90, y, "• Document is corrupted or not a valid .docx file")
-                y -= 14
-                c.drawString(90, y, "• Document uses features not supported by the converter")
-                y -= 14
-                c.drawString(90, y, "• Incompatible Word format (try saving as .docx)")
-                
-                c.save()
-                return True
-                
-            except Exception as e:
-                print(f"Error creating fallback PDF: {e}")
-                # Ultra-minimal PDF
-                with open(output_path, 'wb') as f:
-                    f.write(b'%PDF-1.4\n1 0 obj<</Type/Catalog/Pages 2 0 R>>endobj 2 0 obj<</Type/Pages/Kids[3 0 R]/Count 1>>endobj 3 0 obj<</Type/Page/MediaBox[0 0 612 792]/Parent 2 0 R/Resources<<>>>>endobj xref 0 4 0000000000 65535 f 0000000015 00000 n 0000000060 00000 n 0000000111 00000 n trailer<</Size 4/Root 1 0 R>>startxref 190 %%EOF')
-                return True
\ No newline at end of file
+            raise
@@ -0,0 +1,124 @@
+"""
+Background file conversions. Converters are CPU bound, so jobs run in a
+bounded process pool rather than threads or the request itself. Each web
+process admits at most ``FILE_CONVERSION_WORKERS + FILE_CONVERSION_QUEUE_SIZE``
+jobs at a time; anything beyond that is refused so callers can retry later.
+"""
+import logging
+import multiprocessing
+import os
+import shutil
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import timedelta
+from functools import partial
+
+from django.conf import settings
+from django.utils import timezone
+
+from .models import ConversionJob
+from . import worker
+
+logger = logging.getLogger(__name__)
+
+JOB_ROOT = os.path.join(settings.BASE_DIR, "results", "jobs")
+
+_executor = None
+_in_flight = 0
+_lock = threading.Lock()
+_last_prune = 0
+_prune_lock = threading.Lock()
+
+
+class PoolSaturated(Exception):
+    """Every worker is busy and the queue is full"""
+
+
+def _get_executor():
+    global _executor
+    if _executor is None:
+        _executor = ProcessPoolExecutor(
+            max_workers=getattr(settings, 'FILE_CONVERSION_WORKERS', 2),
+            mp_context=multiprocessing.get_context('spawn'),
+            initializer=worker.init_worker
+        )
+    return _executor
+
+
+def capacity():
+    return getattr(settings, 'FILE_CONVERSION_WORKERS', 2) + getattr(settings, 'FILE_CONVERSION_QUEUE_SIZE', 8)
+
+
+def job_dir(job_id):
+    return os.path.join(JOB_ROOT, str(job_id))
+
+
+def admit():
+    """Reserve a pool slot for one job, or raise ``PoolSaturated``"""
+    global _in_flight
+    with _lock:
+        if _in_flight >= capacity():
+            raise PoolSaturated()
+        _in_flight += 1
+
+
+def release():
+    global _in_flight
+    with _lock:
+        _in_flight = max(0, _in_flight - 1)
+
+
+def submit(job):
+    """Run an admitted job on the pool and return its future"""
+    with _lock:
+        future = _get_executor().submit(worker.run_job, job.pk)
+    future.add_done_callback(partial(_finished, job.pk))
+    maybe_prune()
+    return future
+
+
+def _finished(job_id, future):
+    global _executor
+    release()
+    error = future.exception()
+    if error is None:
+        return
+    # The worker died before it could record the outcome itself
+    logger.error(f"Conversion job {job_id} crashed: {str(error)}")
+    ConversionJob.objects.filter(pk=job_id, status__in=['queued', 'running']).update(
+        status='failed', error=str(error) or error.__class__.__name__, completed_at=timezone.now()
+    )
+    with _lock:
+        if _executor is not None and getattr(_executor, '_broken', False):
+            _executor = None
+
+
+def prune(max_age):
+    """Delete jobs older than ``max_age`` seconds with their files; returns how many"""
+    cutoff = timezone.now() - timedelta(seconds=max_age)
+    expired = ConversionJob.objects.filter(created_at__lt=cutoff).exclude(status__in=['queued', 'running'])
+    job_ids = list(expired.values_list('pk', flat=True))
+    for job_id in job_ids:
+        shutil.rmtree(job_dir(job_id), ignore_errors=True)
+    ConversionJob.objects.filter(pk__in=job_ids).delete()
+    return len(job_ids)
+
+
+def maybe_prune():
+    """
+    Prune jobs older than FILE_CONVERSION_RETENTION, at most once per
+    FILE_CONVERSION_PRUNE_INTERVAL seconds in this process
+    """
+    global _last_prune
+    interval = getattr(settings, 'FILE_CONVERSION_PRUNE_INTERVAL', 60)
+    if interval is None:
+        return
+    with _prune_lock:
+        if time.time() - _last_prune < interval:
+            return
+        _last_prune = time.time()
+    try:
+        prune(getattr(settings, 'FILE_CONVERSION_RETENTION', 60 * 60))
+    except Exception as e:
+        logger.error(f"Error pruning conversion jobs: {str(e)}")
@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+
+from file import result_cache
+
+
+class Command(BaseCommand):
+    help = 'Evicts expired or excess conversion results and prints cache counters'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--max-bytes', type=int, help='Size limit, defaults to FILE_CONVERSION_CACHE_MAX_BYTES')
+        parser.add_argument('--max-age', type=int, help='Age limit in seconds, defaults to FILE_CONVERSION_CACHE_MAX_AGE')
+
+    def handle(self, *args, **options):
+        files, freed = result_cache.evict(max_bytes=options['max_bytes'], max_age=options['max_age'])
+        self.stdout.write(f"Removed {files} cached results ({freed} bytes)")
+
+        stats = result_cache.stats()
+        self.stdout.write(
+            f"Entries: {stats['entries']} ({stats['bytes']} bytes), "
+            f"hits: {stats['hits']}, misses: {stats['misses']}, hit rate: {stats['hit_rate']}, "
+            f"bytes saved: {stats['bytes_saved']}"
+        )
@@ -0,0 +1,18 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from file import jobs
+
+
+class Command(BaseCommand):
+    help = 'Deletes finished conversion jobs and their files once they expire'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--max-age', type=int, help='Age limit in seconds, defaults to FILE_CONVERSION_RETENTION')
+
+    def handle(self, *args, **options):
+        max_age = options['max_age']
+        if max_age is None:
+            max_age = getattr(settings, 'FILE_CONVERSION_RETENTION', 60 * 60)
+        removed = jobs.prune(max_age)
+        self.stdout.write(f"Removed {removed} conversion jobs")
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-17 20:45
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('file', '0002_conversionjob_cache_key'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='conversionjob',
+            name='options',
+            field=models.JSONField(blank=True, default=dict),
+        ),
+    ]
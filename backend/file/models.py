@@ -1,3 +1,33 @@
+import uuid
 from django.db import models
 
-# Create your models here.
+
+class ConversionJob(models.Model):
+    """A file conversion run by the background process pool (see ``file.jobs``)"""
+    STATUSES = [
+        ('queued', 'Queued'),
+        ('running', 'Running'),
+        ('completed', 'Completed'),
+        ('failed', 'Failed'),
+    ]
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    conversion_type = models.CharField(max_length=50)
+    original_name = models.CharField(max_length=255)
+    input_path = models.CharField(max_length=500)
+    # Result cache key of the input bytes, conversion type and options
+    cache_key = models.CharField(max_length=64, blank=True)
+    # Converter options, e.g. dpi, image_format and pages for pdf_to_img
+    options = models.JSONField(default=dict, blank=True)
+    status = models.CharField(max_length=20, choices=STATUSES, default='queued')
+    progress = models.PositiveSmallIntegerField(default=0)
+    output_path = models.CharField(max_length=500, blank=True)
+    output_name = models.CharField(max_length=255, blank=True)
+    content_type = models.CharField(max_length=255, blank=True)
+    error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    completed_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f"{self.conversion_type} of {self.original_name} ({self.status})"
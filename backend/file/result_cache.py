@@ -0,0 +1,44 @@
+"""
+Content-addressed cache of conversion results.
+
+A result is keyed by the SHA-256 of the uploaded bytes, the conversion type
+and the converter options, so converting the same file the same way twice
+only runs the converter once. Files live under ``results/cache``; storage
+and eviction are ``backend.content_cache``'s.
+"""
+import hashlib
+import json
+import os
+
+from django.conf import settings
+from django.core.cache import caches
+
+from backend.content_cache import BackendCounters, ContentCache
+
+CACHE_ROOT = os.path.join(settings.BASE_DIR, "results", "cache")
+
+# Bump when converter output changes so stale results are not served
+CACHE_VERSION = 1
+
+cache = ContentCache(
+    CACHE_ROOT,
+    max_bytes=getattr(settings, 'FILE_CONVERSION_CACHE_MAX_BYTES', 1024 * 1024 * 1024),
+    max_age=getattr(settings, 'FILE_CONVERSION_CACHE_MAX_AGE', 7 * 24 * 60 * 60),
+    evict_interval=getattr(settings, 'FILE_CONVERSION_CACHE_EVICT_INTERVAL', 60),
+    counters=BackendCounters(
+        lambda: caches[getattr(settings, 'FILE_CONVERSION_CACHE_STATS_CACHE', 'default')],
+        'file:result_cache'
+    ),
+    name='conversion results'
+)
+
+lookup = cache.lookup
+store = cache.store
+tee = cache.tee
+evict = cache.evict
+stats = cache.stats
+
+
+def result_key(input_sha256, conversion_type, options=None):
+    payload = json.dumps([CACHE_VERSION, input_sha256, conversion_type, options or {}], sort_keys=True)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
@@ -4,4 +4,7 @@ from . import views
 urlpatterns = [
     path('test/', views.test_view, name='test_view'),
     path('convert/', views.convert_file_view, name='convert_file'),
-]
\ No newline at end of file
+    path('jobs/', views.conversion_jobs_view, name='conversion_jobs'),
+    path('jobs/<uuid:job_id>/', views.conversion_job_view, name='conversion_job'),
+    path('jobs/<uuid:job_id>/download/', views.conversion_job_download_view, name='conversion_job_download'),
+]
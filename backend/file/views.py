@@ -1,20 +1,17 @@
 import os
+import shutil
 import time
+from concurrent.futures import TimeoutError as FutureTimeoutError
 from django.conf import settings
-from django.http import JsonResponse, FileResponse, HttpResponse
+from django.http import JsonResponse, FileResponse, HttpResponse, StreamingHttpResponse
 from django.shortcuts import render
+from django.utils import timezone
+from django.utils.text import get_valid_filename
 from django.views.decorators.csrf import csrf_exempt
-""" from .converters.word_to_pdf import convert_word_to_pdf
-from .converters.pdf_to_word import convert_pdf_to_word
-from .converters.pdf_to_pptx import convert_pdf_to_pptx
-from .converters.pdf_to_img import convert_pdf_to_img
-from .converters.img_to_pdf import convert_img_to_pdf
-from .converters.html_to_pdf import convert_html_to_pdf """
-import zipfile
-import tempfile
-import shutil
 import traceback
-from .converters import html_to_pdf, img_to_pdf, pdf_to_img, pdf_to_pptx, pdf_to_word, word_to_pdf
+from backend import uploads
+from . import conversions, jobs, result_cache
+from .models import ConversionJob
 
 # Allowed file extensions by file type
 ALLOWED_EXTENSIONS = {
@@ -47,127 +44,221 @@ def clean_old_files():
             except Exception as e:
                 print(f"Error cleaning {filepath}: {e}")
 
+def _serialize_job(job):
+    return {
+        "id": str(job.id),
+        "conversion_type": job.conversion_type,
+        "original_name": job.original_name,
+        "options": job.options,
+        "status": job.status,
+        "progress": job.progress,
+        "output_name": job.output_name,
+        "error": job.error,
+        "created_at": job.created_at.isoformat(),
+        "completed_at": job.completed_at.isoformat() if job.completed_at else None,
+        "status_url": f"/api/file/jobs/{job.id}/",
+        "download_url": f"/api/file/jobs/{job.id}/download/" if job.status == "completed" else None,
+    }
+
+
+def _saturated_response():
+    response = JsonResponse({"error": "The converter is busy, please retry shortly"}, status=503)
+    response["Retry-After"] = "10"
+    return response
+
+
+def _prepare_job(request):
+    """
+    Validate a conversion request and store its upload, which is hashed
+    while it streams in. A result already in the cache completes the job on
+    the spot. Returns ``(job, error_response)``; only completed jobs are saved.
+    """
+    # Must be installed before request.POST or request.FILES is first read
+    request.upload_handlers = [uploads.HashingUploadHandler(request)]
+    if "file" not in request.FILES:
+        return None, JsonResponse({"error": "No file uploaded"}, status=400)
+
+    file = request.FILES["file"]
+    conversion_type = request.POST.get("conversion_type")
+    if conversion_type not in conversions.SUPPORTED_TYPES:
+        return None, JsonResponse({"error": f"Unsupported conversion type: {conversion_type}"}, status=400)
+    try:
+        options = conversions.parse_options(conversion_type, request.POST)
+    except ValueError as e:
+        return None, JsonResponse({"error": str(e)}, status=400)
+
+    job = ConversionJob(conversion_type=conversion_type, original_name=file.name, options=options)
+    input_dir = os.path.join(jobs.job_dir(job.id), "input")
+    os.makedirs(input_dir, exist_ok=True)
+    job.input_path = os.path.join(input_dir, get_valid_filename(os.path.basename(file.name)) or "upload")
+    # The temporary file is moved into place, not copied
+    shutil.move(file.temporary_file_path(), job.input_path)
+    file.close()
+    job.cache_key = result_cache.result_key(file.sha256, conversion_type, options)
+
+    cached_path = result_cache.lookup(job.cache_key, conversions.output_extensions(conversion_type, options))
+    if cached_path is not None:
+        shutil.rmtree(jobs.job_dir(job.id), ignore_errors=True)
+        job.output_path = cached_path
+        job.output_name, job.content_type = conversions.describe_output(file.name, cached_path)
+        job.status = "completed"
+        job.progress = 100
+        job.completed_at = timezone.now()
+        job.save()
+    return job, None
+
+
+def _submit_job(job):
+    """Send a prepared job to the process pool. Returns ``(future, error_response)``."""
+    try:
+        jobs.admit()
+    except jobs.PoolSaturated:
+        shutil.rmtree(jobs.job_dir(job.id), ignore_errors=True)
+        return None, _saturated_response()
+
+    try:
+        job.save()
+        return jobs.submit(job), None
+    except Exception:
+        jobs.release()
+        raise
+
+
+def _start_job(request):
+    """
+    Prepare a conversion job and, unless its result was cached, send it to
+    the process pool. Returns ``(job, future, error_response)``; ``future``
+    is None for cache hits.
+    """
+    job, error_response = _prepare_job(request)
+    if error_response is not None or job.status == "completed":
+        return job, None, error_response
+    future, error_response = _submit_job(job)
+    return job, future, error_response
+
+
+def _stream_archive(job, chunks):
+    """
+    Send an archive while it is being rendered, in this process, and cache
+    it once complete. Holds a pool slot so streams count towards the same
+    limit as pooled jobs. The job itself is never saved.
+    """
+    def content():
+        try:
+            yield from result_cache.tee(job.cache_key, ".zip", chunks)
+        except Exception as e:
+            # Headers are gone; all that's left is to cut the archive short
+            print(f"Conversion error: {str(e)}")
+            raise
+        finally:
+            chunks.close()
+            jobs.release()
+            shutil.rmtree(jobs.job_dir(job.id), ignore_errors=True)
+
+    try:
+        jobs.admit()
+    except jobs.PoolSaturated:
+        chunks.close()
+        shutil.rmtree(jobs.job_dir(job.id), ignore_errors=True)
+        return _saturated_response()
+
+    filename = f"{os.path.splitext(os.path.basename(job.original_name))[0]}.zip"
+    response = StreamingHttpResponse(content(), content_type=conversions.CONTENT_TYPES[".zip"])
+    response["Content-Disposition"] = f'attachment; filename="{filename}"'
+    return response
+
+
 @csrf_exempt
 def convert_file_view(request):
-    """Handle file conversion request."""
+    """
+    Handle file conversion request. Multi-page images are streamed as a ZIP
+    while the pages are rendered. Other conversions run on the process
+    pool; this view waits for it and returns the file, or a job to poll
+    when it takes longer than FILE_CONVERSION_SYNC_TIMEOUT.
+    """
     if request.method != "POST":
         return JsonResponse({"error": "Only POST requests are supported"}, status=405)
-        
-    if "file" not in request.FILES:
-        return JsonResponse({"error": "No file uploaded"}, status=400)
-        
-    file = request.FILES["file"]
-    file_type = request.POST.get("file_type")
-    conversion_type = request.POST.get("conversion_type")
-    
-    # For debugging
-    print(f"Received file: {file.name}, file_type: {file_type}, conversion_type: {conversion_type}")
-    
-    # Create temp directory
-    temp_dir = tempfile.mkdtemp()
-    input_path = os.path.join(temp_dir, file.name)
-    
+
     try:
-        # Save uploaded file
-        with open(input_path, "wb+") as destination:
-            for chunk in file.chunks():
-                destination.write(chunk)
-        
-        filename, ext = os.path.splitext(file.name)
-        
-        # Process based on conversion type
-        if conversion_type == "image_to_pdf":
-            output_path = os.path.join(temp_dir, f"{filename}.pdf")
-            img_to_pdf.convert_img_to_pdf(input_path, output_path)
-            content_type = "application/pdf"
-            output_filename = f"{filename}.pdf"
-            
-        elif conversion_type == "pdf_to_img":
-            # Use the directory version of the path for multi-page PDFs
-            pdf_dir = os.path.join(temp_dir, filename)
-            os.makedirs(pdf_dir, exist_ok=True)
-            
-            # Check if it's a multi-page PDF
-            if is_multi_page_pdf(input_path):
-                # Will return a ZIP file with all pages
-                output_path = pdf_to_img.convert_pdf_to_img(input_path, pdf_dir)
-                content_type = "application/zip"
-                output_filename = f"{filename}.zip"
-            else:
-                # Single page PDF returns a single image
-                output_path = pdf_to_img.convert_pdf_to_img(input_path, pdf_dir)
-                content_type = "image/png"
-                output_filename = f"{filename}.png"
-            
-        elif conversion_type == "pdf_to_word":
-            output_path = os.path.join(temp_dir, f"{filename}.docx")
-            pdf_to_word.convert_pdf_to_word(input_path, output_path)
-            content_type = "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
-            output_filename = f"{filename}.docx"
-            
-        elif conversion_type == "html_to_pdf":
-            output_path = os.path.join(temp_dir, f"{filename}.pdf")
-            html_to_pdf.convert_html_to_pdf(input_path, output_path)
-            content_type = "application/pdf"
-            output_filename = f"{filename}.pdf"
-            
-        elif conversion_type == "pdf_to_pptx":
-            output_path = os.path.join(temp_dir, f"{filename}.pptx")
-            pdf_to_pptx.convert_pdf_to_pptx(input_path, output_path)
-            content_type = "application/vnd.openxmlformats-officedocument.presentationml.presentation"
-            output_filename = f"{filename}.pptx"
-            
-        elif conversion_type == "word_to_pdf":
-            output_path = os.path.join(temp_dir, f"{filename}.pdf")
-            word_to_pdf.convert_word_to_pdf(input_path, output_path)
-            content_type = "application/pdf"
-            output_filename = f"{filename}.pdf"
-            
-        else:
-            return JsonResponse({"error": f"Unsupported conversion type: {conversion_type}"}, status=400)
-        
-        # Return the converted file
-        response = FileResponse(open(output_path, "rb"), content_type=content_type)
-        response["Content-Disposition"] = f'attachment; filename="{output_filename}"'
-        
+        job, error_response = _prepare_job(request)
+        if error_response is not None:
+            return error_response
+
+        if job.status != "completed":
+            try:
+                chunks = conversions.stream_archive(job.conversion_type, job.input_path, job.options)
+            except Exception as e:
+                shutil.rmtree(jobs.job_dir(job.id), ignore_errors=True)
+                if isinstance(e, ValueError):
+                    return JsonResponse({"error": str(e)}, status=400)
+                raise
+            if chunks is not None:
+                return _stream_archive(job, chunks)
+
+            future, error_response = _submit_job(job)
+            if error_response is not None:
+                return error_response
+            try:
+                future.result(timeout=getattr(settings, "FILE_CONVERSION_SYNC_TIMEOUT", 30))
+            except FutureTimeoutError:
+                return JsonResponse(_serialize_job(job), status=202)
+            except Exception:
+                # Recorded on the job by the pool's completion callback
+                pass
+            job.refresh_from_db()
+
+        if job.status != "completed":
+            return JsonResponse({"error": job.error or "Conversion failed"}, status=500)
+
+        response = FileResponse(open(job.output_path, "rb"), content_type=job.content_type)
+        response["Content-Disposition"] = f'attachment; filename="{job.output_name}"'
         return response
-        
+
     except Exception as e:
         print(f"Conversion error: {str(e)}")
         print(traceback.format_exc())
         return JsonResponse({"error": str(e)}, status=500)
-        
-    finally:
-        # Cleanup will happen after response is sent
-        import threading
-        import time
-        import shutil
-        
-        def delayed_cleanup():
-            time.sleep(5)  # Wait to ensure response is sent
-            try:
-                if os.path.exists(input_path):
-                    os.remove(input_path)
-                if 'output_path' in locals() and os.path.exists(output_path):
-                    os.remove(output_path)
-                if os.path.exists(temp_dir):
-                    # Use shutil.rmtree instead of os.rmdir for non-empty directories
-                    shutil.rmtree(temp_dir, ignore_errors=True)
-            except Exception as e:
-                print(f"Cleanup error: {e}")
-                
-        threading.Thread(target=delayed_cleanup).start()
 
-# Add helper function to detect multi-page PDFs
-def is_multi_page_pdf(pdf_path):
-    """Check if a PDF has multiple pages."""
+
+@csrf_exempt
+def conversion_jobs_view(request):
+    """Submit a conversion job; poll it at ``status_url``"""
+    if request.method != "POST":
+        return JsonResponse({"error": "Only POST requests are supported"}, status=405)
+
     try:
-        from PyPDF2 import PdfReader
-        reader = PdfReader(pdf_path)
-        return len(reader.pages) > 1
-    except:
-        # If PyPDF2 is not available, assume single page
-        return False
+        job, future, error_response = _start_job(request)
+    except Exception as e:
+        print(f"Conversion error: {str(e)}")
+        return JsonResponse({"error": str(e)}, status=500)
+    if error_response is not None:
+        return error_response
+    # Cached results are ready straight away
+    return JsonResponse(_serialize_job(job), status=202 if future is not None else 200)
+
+
+def conversion_job_view(request, job_id):
+    job = ConversionJob.objects.filter(pk=job_id).first()
+    if job is None:
+        return JsonResponse({"error": "Job not found"}, status=404)
+    return JsonResponse(_serialize_job(job))
+
+
+def conversion_job_download_view(request, job_id):
+    job = ConversionJob.objects.filter(pk=job_id).first()
+    if job is None:
+        return JsonResponse({"error": "Job not found"}, status=404)
+    if job.status != "completed":
+        return JsonResponse({"error": f"Job is {job.status}"}, status=409)
+    if not os.path.exists(job.output_path):
+        return JsonResponse({"error": "The converted file has expired"}, status=410)
+
+    return FileResponse(
+        open(job.output_path, "rb"),
+        as_attachment=True,
+        filename=job.output_name,
+        content_type=job.content_type
+    )
 
 # Add this test view
 def test_view(request):
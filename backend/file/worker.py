@@ -0,0 +1,62 @@
+"""
+Entry points for conversion pool processes. Workers are spawned, so this
+module is imported before Django is set up and must not import models at
+module level.
+"""
+import logging
+import os
+
+logger = logging.getLogger(__name__)
+
+
+def init_worker():
+    # Spawned workers start from scratch and open their own DB connections
+    import django
+    django.setup()
+
+
+def run_job(job_id):
+    """Convert one job's input and record the outcome. Runs in a pool process."""
+    from django.utils import timezone
+
+    from . import conversions, result_cache
+    from .jobs import job_dir
+    from .models import ConversionJob
+
+    updated = ConversionJob.objects.filter(pk=job_id, status='queued').update(
+        status='running', started_at=timezone.now()
+    )
+    if not updated:
+        return
+    job = ConversionJob.objects.get(pk=job_id)
+    output_dir = os.path.join(job_dir(job_id), "output")
+    os.makedirs(output_dir, exist_ok=True)
+
+    def progress(percent):
+        ConversionJob.objects.filter(pk=job_id).update(progress=min(100, max(0, int(percent))))
+
+    try:
+        output_path, output_name, content_type = conversions.convert(
+            job.conversion_type, job.input_path, output_dir, options=job.options, progress=progress
+        )
+    except Exception as e:
+        logger.error(f"Error converting job {job_id}: {str(e)}")
+        ConversionJob.objects.filter(pk=job_id).update(
+            status='failed', error=str(e), completed_at=timezone.now()
+        )
+        return
+
+    if job.cache_key:
+        try:
+            result_cache.store(job.cache_key, output_path)
+        except OSError as e:
+            logger.error(f"Error caching the result of job {job_id}: {str(e)}")
+
+    ConversionJob.objects.filter(pk=job_id).update(
+        status='completed',
+        progress=100,
+        output_path=output_path,
+        output_name=output_name,
+        content_type=content_type,
+        completed_at=timezone.now()
+    )
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-17 20:57
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pomodoro', '0002_pomodorosession_unique_user_session'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='pomodorosession',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+    ]
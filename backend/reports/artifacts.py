@@ -0,0 +1,98 @@
+"""
+Content-addressed cache of rendered report files.
+
+An artifact is keyed by the report parameters (``jobs.params_key``) plus a
+watermark of the rows the report reads, so any change to the underlying
+tasks or sessions produces a new key and stale files are never served.
+Files live under ``MEDIA_ROOT/report_cache``; storage and eviction are
+``backend.content_cache``'s.
+"""
+import hashlib
+import os
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db.models import Count, Max
+
+from backend.content_cache import BackendCounters, ContentCache
+from task.models import Task
+from pomodoro.models import PomodoroSession
+from . import renderers
+
+CACHE_DIR = 'report_cache'
+
+cache = ContentCache(
+    os.path.join(settings.MEDIA_ROOT, CACHE_DIR),
+    max_bytes=getattr(settings, 'REPORT_CACHE_MAX_BYTES', 512 * 1024 * 1024),
+    max_age=getattr(settings, 'REPORT_CACHE_MAX_AGE', 7 * 24 * 60 * 60),
+    evict_interval=getattr(settings, 'REPORT_CACHE_EVICT_INTERVAL', 60),
+    counters=BackendCounters(
+        lambda: caches[getattr(settings, 'REPORT_CACHE_STATS_CACHE', 'default')],
+        'reports:artifacts'
+    ),
+    name='report artifacts'
+)
+
+evict = cache.evict
+stats = cache.stats
+
+
+def data_watermark(user_id, date_from, date_to, sections):
+    """
+    Summarize the rows a report reads into a string that changes whenever
+    those rows do: their count catches rows entering or leaving the range,
+    the latest ``updated_at`` any edit. One aggregate query per section.
+    """
+    parts = []
+    if 'tasks' in sections:
+        tasks = Task.objects.filter(
+            owner_id=user_id,
+            created_at__date__gte=date_from,
+            created_at__date__lte=date_to
+        ).aggregate(count=Count('id'), updated=Max('updated_at'))
+        updated = tasks['updated'].isoformat() if tasks['updated'] else ''
+        parts.append(f"tasks:{tasks['count']}:{updated}")
+
+    if 'pomodoro' in sections:
+        sessions = PomodoroSession.objects.filter(
+            user_id=user_id,
+            date__gte=date_from,
+            date__lte=date_to
+        ).aggregate(count=Count('id'), updated=Max('updated_at'))
+        updated = sessions['updated'].isoformat() if sessions['updated'] else ''
+        parts.append(f"pomodoro:{sessions['count']}:{updated}")
+    return '|'.join(parts)
+
+
+def artifact_key(params_key, watermark):
+    return hashlib.sha256(f"{params_key}|{watermark}".encode('utf-8')).hexdigest()
+
+
+def _extension(report_format):
+    return f".{renderers.EXTENSIONS[report_format]}"
+
+
+def relative_path(key, report_format):
+    """Path of an artifact relative to MEDIA_ROOT, as stored on ``Report.file_path``"""
+    return os.path.relpath(cache.path(key, _extension(report_format)), settings.MEDIA_ROOT)
+
+
+def lookup(key, report_format):
+    """Return the absolute path of a cached artifact, or None on a miss"""
+    return cache.lookup(key, _extension(report_format))
+
+
+def store(key, report_format, write):
+    """
+    Create an artifact by calling ``write(output)`` with a binary file object.
+    The file is renamed into place only once complete.
+    """
+    return cache.write(key, _extension(report_format), write)
+
+
+def tee(key, report_format, chunks):
+    """
+    Pass ``chunks`` through unchanged while also writing them to the cache.
+    The artifact is only published if the generator runs to completion.
+    """
+    return cache.tee(key, _extension(report_format), chunks)
@@ -0,0 +1,151 @@
+"""
+Report data loading. ``load`` reads every section a report needs exactly
+once and returns an immutable ``ReportDataset`` that each renderer
+formats without touching the database again.
+"""
+from dataclasses import dataclass
+
+from django.db.models import Count, Q, Sum
+
+from task.models import Task
+from pomodoro.models import PomodoroSession
+
+# Rows fetched per round trip when streaming detail tables
+REPORT_CHUNK_SIZE = 2000
+
+TASK_COLUMNS = ('title', 'status', 'priority', 'due_date', 'category', 'description')
+SESSION_COLUMNS = ('date', 'focus_time', 'completed')
+
+
+@dataclass(frozen=True)
+class TaskMetrics:
+    total: int
+    completed: int
+
+    @property
+    def completion_rate(self):
+        return int((self.completed / self.total * 100) if self.total > 0 else 0)
+
+
+@dataclass(frozen=True)
+class PomodoroMetrics:
+    total: int
+    completed: int
+    focus_minutes: int
+
+    @property
+    def focus_hours(self):
+        return round(self.focus_minutes / 60, 1)
+
+
+class StreamedRows:
+    """
+    Detail rows read through a chunked DB iterator instead of being held in
+    memory. Each iteration runs the query once, so renderers should only
+    walk the rows a single time.
+    """
+    def __init__(self, queryset, columns):
+        self._queryset = queryset
+        self._columns = columns
+
+    def __iter__(self):
+        return self._queryset.values_list(*self._columns, named=True).iterator(
+            chunk_size=REPORT_CHUNK_SIZE
+        )
+
+
+@dataclass(frozen=True)
+class ReportDataset:
+    report_type: str
+    format: str
+    date_from: object
+    date_to: object
+    sections: frozenset
+    include_charts: bool
+    include_metrics: bool
+    task_metrics: TaskMetrics = None
+    pomodoro_metrics: PomodoroMetrics = None
+    # Tuples of named rows, or StreamedRows when loaded with stream=True
+    tasks: object = ()
+    sessions: object = ()
+
+    @property
+    def period(self):
+        return f"Period: {self.date_from.strftime('%B %d, %Y')} to {self.date_to.strftime('%B %d, %Y')}"
+
+
+def _tasks(report):
+    return Task.objects.filter(
+        owner_id=report.user_id,
+        created_at__date__gte=report.date_from,
+        created_at__date__lte=report.date_to
+    ).order_by('-created_at')
+
+
+def _sessions(report):
+    return PomodoroSession.objects.filter(
+        user_id=report.user_id,
+        date__gte=report.date_from,
+        date__lte=report.date_to
+    ).order_by('-date')
+
+
+def load(report, stream=False):
+    """
+    Load the data for ``report``. By default detail rows are fetched with one
+    query per section and metrics are computed from them in memory. With
+    ``stream=True`` metrics come from one aggregate per section and detail
+    rows are left to be streamed, keeping memory flat for large exports.
+    """
+    sections = frozenset(report.sections)
+    loaded = {}
+
+    if 'tasks' in sections:
+        tasks = _tasks(report)
+        if stream:
+            loaded['tasks'] = StreamedRows(tasks, TASK_COLUMNS)
+            if report.include_metrics:
+                totals = tasks.order_by().aggregate(
+                    total=Count('id'),
+                    completed=Count('id', filter=Q(status='completed'))
+                )
+                loaded['task_metrics'] = TaskMetrics(totals['total'], totals['completed'])
+        else:
+            rows = tuple(tasks.values_list(*TASK_COLUMNS, named=True))
+            loaded['tasks'] = rows
+            loaded['task_metrics'] = TaskMetrics(
+                len(rows), sum(1 for row in rows if row.status == 'completed')
+            )
+
+    if 'pomodoro' in sections:
+        sessions = _sessions(report)
+        if stream:
+            loaded['sessions'] = StreamedRows(sessions, SESSION_COLUMNS)
+            if report.include_metrics:
+                totals = sessions.order_by().aggregate(
+                    total=Count('id'),
+                    completed=Count('id', filter=Q(completed=True)),
+                    focus_time=Sum('focus_time')
+                )
+                loaded['pomodoro_metrics'] = PomodoroMetrics(
+                    totals['total'], totals['completed'], totals['focus_time'] or 0
+                )
+        else:
+            rows = tuple(sessions.values_list(*SESSION_COLUMNS, named=True))
+            loaded['sessions'] = rows
+            loaded['pomodoro_metrics'] = PomodoroMetrics(
+                len(rows),
+                sum(1 for row in rows if row.completed),
+                sum(row.focus_time for row in rows)
+            )
+
+    return ReportDataset(
+        report_type=report.report_type,
+        format=report.format,
+        date_from=report.date_from,
+        date_to=report.date_to,
+        sections=sections,
+        include_charts=report.include_charts,
+        include_metrics=report.include_metrics,
+        **loaded
+    )
@@ -0,0 +1,128 @@
+"""
+Background report builds. Jobs are ``Report`` rows in the ``pending``
+state; a process pool renders them into the artifact cache (see
+``artifacts``). reportlab and xlsxwriter are CPU bound and hold the GIL,
+so builds run in separate processes rather than threads, leaving request
+threads free.
+"""
+import hashlib
+import json
+import logging
+import os
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from datetime import timedelta
+from functools import partial
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import Report
+from . import worker
+
+logger = logging.getLogger(__name__)
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ProcessPoolExecutor(
+                max_workers=getattr(settings, 'REPORT_WORKERS', 2),
+                mp_context=multiprocessing.get_context('spawn'),
+                initializer=worker.init_worker
+            )
+        return _executor
+
+
+def params_key(user_id, report_type, report_format, date_from, date_to, sections,
+               include_charts, include_metrics):
+    """Hash the parameters that determine a report's content"""
+    payload = json.dumps([
+        user_id,
+        report_type,
+        report_format,
+        date_from.isoformat() if date_from else None,
+        date_to.isoformat() if date_to else None,
+        sorted(sections),
+        bool(include_charts),
+        bool(include_metrics),
+    ])
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def artifact_path(report):
+    """Absolute path of a report's file on disk, or None if it has none"""
+    if not report.file_path:
+        return None
+    return os.path.join(settings.MEDIA_ROOT, report.file_path)
+
+
+def expire_stale(user=None):
+    """
+    Fail pending or running reports older than REPORT_JOB_TIMEOUT. Their
+    worker died with the web process that owned it, so nothing else will finish them.
+    Returns how many were expired.
+    """
+    cutoff = timezone.now() - timedelta(seconds=getattr(settings, 'REPORT_JOB_TIMEOUT', 15 * 60))
+    stale = Report.objects.filter(
+        Q(status='pending', created_at__lt=cutoff) | Q(status='running', started_at__lt=cutoff)
+    )
+    if user is not None:
+        stale = stale.filter(user=user)
+    return stale.update(status='failed', error='Report build timed out', completed_at=timezone.now())
+
+
+def find_reusable(user, key, file_path=None):
+    """
+    Return an existing report with the same parameters that is either
+    still being built or, when ``file_path`` is given, already points at
+    that artifact on disk. Builds that outlived REPORT_JOB_TIMEOUT are
+    failed first rather than reused.
+    """
+    expire_stale(user)
+    in_progress = Report.objects.filter(
+        user=user,
+        params_key=key,
+        status__in=['pending', 'running']
+    ).order_by('-created_at').first()
+    if in_progress is not None or file_path is None:
+        return in_progress
+
+    return Report.objects.filter(
+        user=user,
+        params_key=key,
+        status='completed',
+        file_path=file_path
+    ).order_by('-created_at').first()
+
+
+def enqueue(report):
+    """Schedule a pending report to be built once the current transaction commits"""
+    transaction.on_commit(partial(_submit, report.pk))
+
+
+def _submit(report_id):
+    future = _get_executor().submit(worker.build_report, report_id)
+    future.add_done_callback(partial(_finished, report_id))
+
+
+def _finished(report_id, future):
+    global _executor
+    error = future.exception()
+    if error is None:
+        return
+    # The worker died before it could record the outcome itself
+    logger.error(f"Report build {report_id} crashed: {str(error)}")
+    Report.objects.filter(pk=report_id, status__in=['pending', 'running']).update(
+        status='failed', error=str(error) or error.__class__.__name__, completed_at=timezone.now()
+    )
+    with _executor_lock:
+        if _executor is not None and getattr(_executor, '_broken', False):
+            _executor = None
@@ -0,0 +1,76 @@
+import os
+import random
+import resource
+import tempfile
+import time
+import tracemalloc
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from backend import benchmarks
+from reports import datasets, renderers
+from reports.models import Report
+from task.models import Task
+
+
+class Command(BaseCommand):
+    help = 'Compares peak memory of in-memory and constant-memory Excel report builds'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--tasks', type=int, default=100000, help='Number of tasks to seed')
+
+    def handle(self, *args, **options):
+        with benchmarks.rolled_back():
+            user = benchmarks.create_user()
+            self._seed(user, options['tasks'])
+            report = Report(
+                user=user,
+                report_type='tasks',
+                format='excel',
+                date_from=timezone.localdate() - timedelta(days=365),
+                date_to=timezone.localdate(),
+                sections=['tasks'],
+            )
+            self._run(report)
+
+    def _seed(self, user, count):
+        statuses = ['todo', 'inprogress', 'completed']
+        priorities = ['low', 'medium', 'high']
+        Task.objects.bulk_create(
+            (
+                Task(
+                    owner=user,
+                    title=f"Task {i}",
+                    description=f"Benchmark task number {i}",
+                    status=random.choice(statuses),
+                    priority=random.choice(priorities),
+                    category='benchmark',
+                )
+                for i in range(count)
+            ),
+            batch_size=5000
+        )
+        self.stdout.write(f"Seeded {count} tasks")
+
+    def _run(self, report):
+        self.stdout.write(f"{'mode':>16} {'peak MB':>10} {'seconds':>10} {'file MB':>10}")
+        # Python allocations are traced per run; process RSS is only reported once
+        for label, streamed in [('in-memory', False), ('constant-memory', True)]:
+            with tempfile.NamedTemporaryFile(suffix='.xlsx') as output:
+                tracemalloc.start()
+                started = time.perf_counter()
+                dataset = datasets.load(report, stream=streamed)
+                renderers.render_excel(dataset, output, constant_memory=streamed)
+                elapsed = time.perf_counter() - started
+                _, peak = tracemalloc.get_traced_memory()
+                tracemalloc.stop()
+                size = os.path.getsize(output.name)
+
+            self.stdout.write(
+                f"{label:>16} {peak / 1024 / 1024:>10.1f} {elapsed:>10.2f} {size / 1024 / 1024:>10.1f}"
+            )
+
+        max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+        self.stdout.write(f"Process max RSS: {max_rss:.1f} MB")
@@ -0,0 +1,64 @@
+import dataclasses
+import io
+import random
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.test.utils import override_settings
+from django.utils import timezone
+
+from backend import benchmarks
+from reports import datasets, renderers
+from reports.models import Report
+from task.models import Task
+
+
+class Command(BaseCommand):
+    help = 'Measures PDF report build time for growing numbers of task rows'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--rows', type=int, nargs='+', default=[1000, 5000, 10000, 20000],
+            help='Task row counts to render'
+        )
+
+    def handle(self, *args, **options):
+        sizes = sorted(options['rows'])
+        with benchmarks.rolled_back():
+            user = benchmarks.create_user()
+            self._seed(user, sizes[-1])
+            report = Report(
+                user=user,
+                report_type='tasks',
+                format='pdf',
+                date_from=timezone.localdate() - timedelta(days=365),
+                date_to=timezone.localdate(),
+                sections=['tasks'],
+            )
+            self._run(datasets.load(report), sizes)
+
+    def _seed(self, user, count):
+        statuses = ['todo', 'inprogress', 'completed']
+        Task.objects.bulk_create(
+            (
+                Task(owner=user, title=f"Task {i}", status=random.choice(statuses))
+                for i in range(count)
+            ),
+            batch_size=5000
+        )
+        self.stdout.write(f"Seeded {count} tasks")
+
+    def _run(self, dataset, sizes):
+        self.stdout.write(f"{'rows':>8} {'seconds':>10} {'ms/row':>8} {'size KB':>10}")
+        for size in sizes:
+            subset = dataclasses.replace(dataset, tasks=dataset.tasks[:size])
+            output = io.BytesIO()
+            # Lift the row cap so every row is laid out
+            with override_settings(REPORT_PDF_MAX_ROWS=size):
+                started = time.perf_counter()
+                renderers.render_pdf(subset, output)
+                elapsed = time.perf_counter() - started
+            self.stdout.write(
+                f"{size:>8} {elapsed:>10.2f} {elapsed * 1000 / size:>8.3f} {len(output.getvalue()) / 1024:>10.0f}"
+            )
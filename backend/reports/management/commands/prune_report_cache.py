@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+
+from reports import artifacts
+
+
+class Command(BaseCommand):
+    help = 'Evicts expired or excess report artifacts and prints cache counters'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--max-bytes', type=int, help='Size limit, defaults to REPORT_CACHE_MAX_BYTES')
+        parser.add_argument('--max-age', type=int, help='Age limit in seconds, defaults to REPORT_CACHE_MAX_AGE')
+
+    def handle(self, *args, **options):
+        files, freed = artifacts.evict(max_bytes=options['max_bytes'], max_age=options['max_age'])
+        self.stdout.write(f"Removed {files} artifacts ({freed} bytes)")
+
+        stats = artifacts.stats()
+        self.stdout.write(
+            f"Entries: {stats['entries']} ({stats['bytes']} bytes), "
+            f"hits: {stats['hits']}, misses: {stats['misses']}, hit rate: {stats['hit_rate']}"
+        )
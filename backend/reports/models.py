@@ -17,12 +17,28 @@ class Report(models.Model):
         ('csv', 'CSV'),
     ]
     
+    STATUSES = [
+        ('pending', 'Pending'),
+        ('running', 'Running'),
+        ('completed', 'Completed'),
+        ('failed', 'Failed'),
+    ]
+    
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='reports')
     report_type = models.CharField(max_length=50, choices=REPORT_TYPES)
     format = models.CharField(max_length=10, choices=FORMATS)
     date_from = models.DateField(null=True, blank=True)
     date_to = models.DateField(null=True, blank=True)
+    sections = models.JSONField(default=list, blank=True)
+    include_charts = models.BooleanField(default=True)
+    include_metrics = models.BooleanField(default=True)
+    status = models.CharField(max_length=20, choices=STATUSES, default='completed')
+    # Hash of the generation parameters, used to reuse identical artifacts
+    params_key = models.CharField(max_length=64, blank=True, db_index=True)
+    error = models.TextField(blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    completed_at = models.DateTimeField(null=True, blank=True)
     file_path = models.CharField(max_length=255, null=True, blank=True)
     
     def __str__(self):
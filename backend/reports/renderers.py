@@ -0,0 +1,364 @@
+"""
+Report renderers shared by the synchronous generate view and the
+background report workers. Each renderer formats a ``ReportDataset``
+(see ``datasets.load``) and writes the finished document to ``output``;
+none of them query the database.
+"""
+import csv
+import io
+import tempfile
+
+from django.conf import settings
+
+# Attempt to import report generation libs, with graceful fallbacks
+try:
+    import xlsxwriter
+except ImportError:
+    xlsxwriter = None
+
+try:
+    import reportlab
+    from reportlab.lib.pagesizes import letter
+    from reportlab.lib.styles import getSampleStyleSheet
+    from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle, PageBreak
+    from reportlab.lib import colors
+except ImportError:
+    reportlab = None
+
+CONTENT_TYPES = {
+    'pdf': 'application/pdf',
+    'excel': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+    'csv': 'text/csv',
+}
+
+# Formats whose renderers walk detail rows once, in order, so their
+# datasets can be streamed from the database
+STREAMING_FORMATS = {'csv', 'excel'}
+
+# Detail tables in PDFs are laid out in fixed-size chunks with fixed
+# column widths, so build time grows linearly with the row count
+PDF_CHUNK_ROWS = 40
+PDF_ROW_HEIGHT = 18
+PDF_COLUMNS = {
+    'tasks': (['Title', 'Status', 'Priority', 'Due Date'], [216, 84, 72, 96]),
+    'pomodoro': (['Date', 'Focus Time (mins)', 'Completed'], [156, 156, 156]),
+}
+
+EXTENSIONS = {
+    'pdf': 'pdf',
+    'excel': 'xlsx',
+    'csv': 'csv',
+}
+
+
+class ReportUnavailable(Exception):
+    """Raised when the library needed for a report format is not installed"""
+
+
+class Echo:
+    """File-like object whose write() returns the value instead of buffering it"""
+    def write(self, value):
+        return value
+
+
+def _task_cells(task):
+    """Format a task row for the detail tables"""
+    return [
+        task.title,
+        task.status.title(),
+        task.priority.title() if task.priority else 'N/A',
+        task.due_date.strftime('%Y-%m-%d') if task.due_date else 'N/A',
+        task.category or 'N/A',
+        task.description or ''
+    ]
+
+
+def _session_cells(session):
+    """Format a pomodoro session row for the PDF detail table"""
+    return [
+        session.date.strftime('%Y-%m-%d'),
+        str(session.focus_time),
+        'Yes' if session.completed else 'No'
+    ]
+
+
+def _clip(value, width):
+    """Cut text so it fits a fixed-width column at the table's 10pt font"""
+    limit = int(width / 5.5)
+    return value if len(value) <= limit else value[:limit - 1] + '\u2026'
+
+
+def _pdf_tables(headers, widths, rows, style):
+    """
+    Lay out detail rows as a series of page-sized tables. Each chunk has
+    fixed column widths and row heights so reportlab never measures cells,
+    and repeats the header if it still has to be split across pages.
+    """
+    tables = []
+    for start in range(0, len(rows), PDF_CHUNK_ROWS):
+        chunk = [headers] + [
+            [_clip(cell, width) for cell, width in zip(row, widths)]
+            for row in rows[start:start + PDF_CHUNK_ROWS]
+        ]
+        table = Table(chunk, colWidths=widths, rowHeights=PDF_ROW_HEIGHT, repeatRows=1)
+        table.setStyle(style)
+        tables.append(table)
+    return tables
+
+
+def _metrics(dataset):
+    """Return (label, value) pairs for the summary metrics of a dataset"""
+    metrics = []
+    if dataset.task_metrics is not None:
+        metrics += [
+            ("Total Tasks", dataset.task_metrics.total),
+            ("Completed Tasks", dataset.task_metrics.completed),
+            ("Completion Rate", f"{dataset.task_metrics.completion_rate}%"),
+        ]
+    if dataset.pomodoro_metrics is not None:
+        metrics += [
+            ("Focus Sessions", dataset.pomodoro_metrics.total),
+            ("Completed Sessions", dataset.pomodoro_metrics.completed),
+            ("Total Focus Time", f"{dataset.pomodoro_metrics.focus_hours} hours"),
+        ]
+    return metrics
+
+
+def render(dataset, output):
+    """Render ``dataset`` in its own format into the binary file object ``output``"""
+    if dataset.format == 'pdf':
+        render_pdf(dataset, output)
+    elif dataset.format == 'excel':
+        render_excel(dataset, output)
+    elif dataset.format == 'csv':
+        render_csv(dataset, output)
+    else:
+        raise ValueError(f"Unsupported report format: {dataset.format}")
+
+
+def render_pdf(dataset, output):
+    """Generate a PDF report"""
+    if reportlab is None:
+        raise ReportUnavailable("PDF generation is not available. Please install reportlab.")
+
+    doc = SimpleDocTemplate(output, pagesize=letter)
+    styles = getSampleStyleSheet()
+    elements = []
+
+    # Add title and date range
+    elements.append(Paragraph(f"{dataset.report_type.title()} Report", styles['Title']))
+    elements.append(Paragraph(dataset.period, styles['Normal']))
+    elements.append(Spacer(1, 12))
+
+    # Add metrics if requested
+    if dataset.include_metrics:
+        elements.append(Paragraph("Summary Metrics", styles['Heading2']))
+
+        metrics_data = [['Metric', 'Value']]
+        metrics_data += [[label, str(value)] for label, value in _metrics(dataset)]
+
+        metrics_table = Table(metrics_data)
+        metrics_table.setStyle(TableStyle([
+            ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
+            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+            ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+            ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
+            ('GRID', (0, 0), (-1, -1), 1, colors.black)
+        ]))
+
+        elements.append(metrics_table)
+        elements.append(Spacer(1, 24))
+
+    detail_style = TableStyle([
+        ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
+        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+        ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+        ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+        ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
+        ('GRID', (0, 0), (-1, -1), 1, colors.black)
+    ])
+    max_rows = getattr(settings, 'REPORT_PDF_MAX_ROWS', 2000)
+    appendix = []
+
+    details = [
+        ('tasks', "Task Details", "No tasks found for the selected period.",
+         [_task_cells(task)[:4] for task in dataset.tasks]),
+        ('pomodoro', "Pomodoro Sessions", "No Pomodoro sessions found for the selected period.",
+         [_session_cells(session) for session in dataset.sessions]),
+    ]
+    for section, heading, empty_text, rows in details:
+        if section not in dataset.sections:
+            continue
+
+        elements.append(Paragraph(heading, styles['Heading2']))
+        if not rows:
+            elements.append(Paragraph(empty_text, styles['Normal']))
+            elements.append(Spacer(1, 24))
+            continue
+
+        headers, widths = PDF_COLUMNS[section]
+        elements.extend(_pdf_tables(headers, widths, rows[:max_rows], detail_style))
+
+        # Rows past the cap are summarized, or listed at the end of the document
+        hidden = rows[max_rows:]
+        if hidden:
+            if getattr(settings, 'REPORT_PDF_APPENDIX', False):
+                elements.append(Paragraph(f"{len(hidden)} more rows are listed in the appendix.", styles['Italic']))
+                appendix.append((heading, headers, widths, hidden))
+            else:
+                elements.append(Paragraph(f"{len(hidden)} more rows not shown.", styles['Italic']))
+        elements.append(Spacer(1, 24))
+
+    for heading, headers, widths, rows in appendix:
+        elements.append(PageBreak())
+        elements.append(Paragraph(f"Appendix: {heading}", styles['Heading2']))
+        elements.extend(_pdf_tables(headers, widths, rows, detail_style))
+
+    doc.build(elements)
+
+
+def render_excel(dataset, output, constant_memory=True):
+    """
+    Generate an Excel report. In ``constant_memory`` mode xlsxwriter flushes
+    each row to disk as soon as the next one starts, so every sheet must be
+    written strictly top to bottom. Its scratch files go to a private
+    temporary directory that is removed as soon as the workbook is done.
+    """
+    if xlsxwriter is None:
+        raise ReportUnavailable("Excel generation is not available. Please install xlsxwriter.")
+
+    with tempfile.TemporaryDirectory(prefix='report-xlsx-') as tmpdir:
+        workbook = xlsxwriter.Workbook(output, {
+            'constant_memory': constant_memory,
+            'tmpdir': tmpdir,
+        })
+        try:
+            _write_workbook(workbook, dataset)
+        finally:
+            workbook.close()
+
+
+def _write_workbook(workbook, dataset):
+    summary_sheet = workbook.add_worksheet('Summary')
+
+    # Add formats
+    title_format = workbook.add_format({
+        'bold': True,
+        'font_size': 16,
+        'align': 'center',
+        'valign': 'vcenter'
+    })
+    header_format = workbook.add_format({
+        'bold': True,
+        'bg_color': '#CCCCCC',
+        'border': 1
+    })
+    cell_format = workbook.add_format({
+        'border': 1
+    })
+    heading_format = workbook.add_format({'bold': True, 'font_size': 14})
+    link_format = workbook.add_format({'color': 'blue', 'underline': True})
+
+    # Write title and date range
+    summary_sheet.merge_range('A1:E1', f"{dataset.report_type.title()} Report", title_format)
+    summary_sheet.merge_range('A2:E2', dataset.period, workbook.add_format({'align': 'center'}))
+
+    row = 4  # Start from row 4
+
+    # Add metrics if requested
+    if dataset.include_metrics:
+        summary_sheet.write(row, 0, "Summary Metrics", heading_format)
+        row += 2
+
+        summary_sheet.write(row, 0, "Metric", header_format)
+        summary_sheet.write(row, 1, "Value", header_format)
+        row += 1
+
+        for label, value in _metrics(dataset):
+            summary_sheet.write(row, 0, label, cell_format)
+            summary_sheet.write(row, 1, value, cell_format)
+            row += 1
+
+    row += 2  # Add some space
+
+    # Add task details if included
+    if 'tasks' in dataset.sections:
+        tasks_sheet = workbook.add_worksheet('Tasks')
+        headers = ["Title", "Status", "Priority", "Due Date", "Category", "Description"]
+        for col, header in enumerate(headers):
+            tasks_sheet.write(0, col, header, header_format)
+
+        task_count = 0
+        for task in dataset.tasks:
+            task_count += 1
+            tasks_sheet.write_row(task_count, 0, _task_cells(task), cell_format)
+
+        summary_sheet.write(row, 0, "Task Details", heading_format)
+        summary_sheet.write(row, 1, f"See 'Tasks' sheet ({task_count} tasks)", link_format)
+        row += 2
+
+    # Add pomodoro details if included
+    if 'pomodoro' in dataset.sections:
+        pomodoro_sheet = workbook.add_worksheet('Pomodoro')
+        for col, header in enumerate(["Date", "Focus Time (mins)", "Completed"]):
+            pomodoro_sheet.write(0, col, header, header_format)
+
+        session_count = 0
+        for session in dataset.sessions:
+            session_count += 1
+            pomodoro_sheet.write_row(session_count, 0, [
+                session.date.strftime('%Y-%m-%d'),
+                session.focus_time,
+                'Yes' if session.completed else 'No'
+            ], cell_format)
+
+        summary_sheet.write(row, 0, "Pomodoro Sessions", heading_format)
+        summary_sheet.write(row, 1, f"See 'Pomodoro' sheet ({session_count} sessions)", link_format)
+        row += 2
+
+
+def csv_rows(dataset):
+    """Yield CSV rows lazily, so streamed datasets never sit in memory"""
+    yield [f"{dataset.report_type.title()} Report"]
+    yield [dataset.period]
+    yield []  # Empty row for spacing
+
+    # Add metrics if requested
+    if dataset.include_metrics:
+        yield ["Summary Metrics"]
+        yield ["Metric", "Value"]
+        for label, value in _metrics(dataset):
+            yield [label, value]
+        yield []  # Empty row for spacing
+
+    # Add task details if included
+    if 'tasks' in dataset.sections:
+        yield ["Task Details"]
+        yield ["Title", "Status", "Priority", "Due Date", "Category", "Description"]
+        for task in dataset.tasks:
+            yield _task_cells(task)
+        yield []  # Empty row for spacing
+
+    # Add pomodoro details if included
+    if 'pomodoro' in dataset.sections:
+        yield ["Pomodoro Sessions"]
+        yield ["Date", "Focus Time (mins)", "Completed"]
+        for session in dataset.sessions:
+            yield [
+                session.date.strftime('%Y-%m-%d'),
+                session.focus_time,
+                'Yes' if session.completed else 'No'
+            ]
+
+
+def render_csv(dataset, output):
+    """Write the CSV report to a binary file object"""
+    text = io.TextIOWrapper(output, encoding='utf-8', newline='')
+    try:
+        csv.writer(text).writerows(csv_rows(dataset))
+    finally:
+        text.flush()
+        text.detach()
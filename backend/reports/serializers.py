@@ -0,0 +1,19 @@
+from rest_framework import serializers
+from .models import Report
+
+class ReportSerializer(serializers.ModelSerializer):
+    download_url = serializers.SerializerMethodField()
+    
+    class Meta:
+        model = Report
+        fields = [
+            'id', 'report_type', 'format', 'date_from', 'date_to', 'sections',
+            'include_charts', 'include_metrics', 'status', 'error',
+            'created_at', 'completed_at', 'download_url'
+        ]
+        read_only_fields = fields
+    
+    def get_download_url(self, obj):
+        if obj.status != 'completed' or not obj.file_path:
+            return None
+        return f"/api/reports/jobs/{obj.pk}/download/"
@@ -1,7 +1,18 @@
 from django.urls import path
-from .views import ReportPreviewView, ReportGenerateView
+from .views import (
+    ReportPreviewView,
+    ReportGenerateView,
+    ReportJobListView,
+    ReportJobDetailView,
+    ReportDownloadView,
+    ReportCacheStatsView,
+)
 
 urlpatterns = [
     path('preview/', ReportPreviewView.as_view(), name='report-preview'),
     path('generate/', ReportGenerateView.as_view(), name='report-generate'),
+    path('jobs/', ReportJobListView.as_view(), name='report-jobs'),
+    path('jobs/<int:pk>/', ReportJobDetailView.as_view(), name='report-job-detail'),
+    path('jobs/<int:pk>/download/', ReportDownloadView.as_view(), name='report-download'),
+    path('cache/stats/', ReportCacheStatsView.as_view(), name='report-cache-stats'),
 ]
@@ -0,0 +1,53 @@
+"""
+Entry points for report pool processes. Workers are spawned, so this
+module is imported before Django is set up and must not import models at
+module level.
+"""
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+def init_worker():
+    # Spawned workers start from scratch and open their own DB connections
+    import django
+    django.setup()
+
+
+def build_report(report_id):
+    """Render a report to disk and record the outcome. Runs in a pool process."""
+    from django.db import close_old_connections
+    from django.utils import timezone
+
+    from . import artifacts, datasets, renderers
+    from .models import Report
+
+    close_old_connections()
+    try:
+        updated = Report.objects.filter(pk=report_id, status='pending').update(
+            status='running', started_at=timezone.now()
+        )
+        if not updated:
+            return
+        report = Report.objects.select_related('user').get(pk=report_id)
+
+        watermark = artifacts.data_watermark(
+            report.user_id, report.date_from, report.date_to, report.sections
+        )
+        key = artifacts.artifact_key(report.params_key, watermark)
+        if artifacts.lookup(key, report.format) is None:
+            # CSV and Excel are written row by row, so their rows are streamed
+            dataset = datasets.load(report, stream=report.format in renderers.STREAMING_FORMATS)
+            artifacts.store(key, report.format, lambda output: renderers.render(dataset, output))
+        relative_path = artifacts.relative_path(key, report.format)
+
+        Report.objects.filter(pk=report_id).update(
+            status='completed',
+            file_path=relative_path,
+            completed_at=timezone.now()
+        )
+    except Exception as e:
+        logger.error(f"Error building report {report_id}: {str(e)}")
+        Report.objects.filter(pk=report_id).update(status='failed', error=str(e))
+    finally:
+        close_old_connections()
@@ -1,5 +1,7 @@
 import os
 import time
+import shutil
+import hashlib
 import logging
 import traceback
 import threading
@@ -14,6 +16,7 @@ from converters.pdf_to_word import convert_pdf_to_word
 from converters.html_to_pdf import convert_html_to_pdf
 from converters.pdf_to_pptx import convert_pdf_to_pptx
 from converters.word_to_pdf import convert_word_to_pdf
+from result_cache import ConversionResultCache
 
 # Configure logging
 logging.basicConfig(
@@ -25,6 +28,11 @@ logger = logging.getLogger(__name__)
 # Define folders for uploads and results
 UPLOAD_FOLDER = os.path.abspath("uploads")
 RESULT_FOLDER = os.path.abspath("results")
+# Cached conversion results; evicted by the cleanup service, not aged out with results
+CACHE_FOLDER = os.path.abspath("cache")
+
+# Bytes read per chunk while saving and hashing uploads
+UPLOAD_CHUNK_SIZE = 64 * 1024
 
 # Allowed file extensions
 ALLOWED_EXTENSIONS = {
@@ -36,8 +44,9 @@ ALLOWED_EXTENSIONS = {
 
 # File cleanup service
 class FileCleanupService:
-    def __init__(self, directories, max_age_seconds=3600, check_interval_seconds=300):
+    def __init__(self, directories, max_age_seconds=3600, check_interval_seconds=300, result_caches=None):
         self.directories = directories
+        self.result_caches = result_caches or []
         self.max_age_seconds = max_age_seconds
         self.check_interval_seconds = check_interval_seconds
         self.stop_event = threading.Event()
@@ -108,6 +117,13 @@ class FileCleanupService:
         
         logger.info(f"Cleanup completed: {cleaned_count} files removed")
 
+        # Caches keep their entries by recency and size rather than age
+        for cache in self.result_caches:
+            try:
+                cache.evict()
+            except Exception as e:
+                logger.error(f"Failed to evict result cache {cache.root}: {str(e)}")
+
 # Initialize Flask app with CORS
 app = Flask(__name__)
 CORS(app, resources={
@@ -121,11 +137,19 @@ for folder in [UPLOAD_FOLDER, RESULT_FOLDER]:
         os.makedirs(folder)
         logger.info(f"Created directory: {folder}")
 
+# Conversion result cache
+result_cache = ConversionResultCache(
+    CACHE_FOLDER,
+    max_bytes=int(os.environ.get('RESULT_CACHE_MAX_BYTES', 1024 * 1024 * 1024)),  # 1 GB
+    max_age_seconds=7 * 24 * 3600  # Drop results unused for a week
+)
+
 # Initialize cleanup service
 cleanup_service = FileCleanupService(
     directories=[UPLOAD_FOLDER, RESULT_FOLDER],
     max_age_seconds=3600,  # Keep files for 1 hour
-    check_interval_seconds=300  # Check every 5 minutes
+    check_interval_seconds=300,  # Check every 5 minutes
+    result_caches=[result_cache]
 )
 
 def allowed_file(filename, file_type):
@@ -164,11 +188,18 @@ def api_convert():
             logger.error(f"File type not allowed: {file.filename}, expected type: {file_type}")
             return jsonify({"error": f"File type not allowed for {file_type}"}), 400
         
-        # Save the uploaded file
+        # Save the uploaded file, hashing it as it streams to disk
         filename = secure_filename(file.filename)
         filepath = os.path.join(UPLOAD_FOLDER, filename)
         logger.info(f"Saving uploaded file to {filepath}")
-        file.save(filepath)
+        digest = hashlib.sha256()
+        with open(filepath, "wb") as destination:
+            while True:
+                chunk = file.stream.read(UPLOAD_CHUNK_SIZE)
+                if not chunk:
+                    break
+                digest.update(chunk)
+                destination.write(chunk)
         
         # Prepare output filename based on conversion type
         output_filename = f"converted_{filename}"
@@ -184,27 +215,40 @@ def api_convert():
         output_path = os.path.join(RESULT_FOLDER, output_filename)
         logger.info(f"Output path: {output_path}")
         
-        # Perform the conversion
-        if conversion_type == "img_to_pdf":
-            convert_img_to_pdf(filepath, output_path)
-        elif conversion_type == "pdf_to_img":
-            convert_pdf_to_img(filepath, output_path)
-        elif conversion_type == "pdf_to_word":
-            convert_pdf_to_word(filepath, output_path)
-        elif conversion_type == "html_to_pdf":
-            convert_html_to_pdf(filepath, output_path)
-        elif conversion_type == "pdf_to_pptx":
-            convert_pdf_to_pptx(filepath, output_path)
-        elif conversion_type == "word_to_pdf":
-            convert_word_to_pdf(filepath, output_path)
+        # Reuse an earlier conversion of the same bytes
+        cache_key = result_cache.make_key(digest.hexdigest(), conversion_type)
+        cached_path = result_cache.lookup(cache_key, os.path.splitext(output_path)[1].lower())
+        # Start from a fresh file: the previous result under this name may
+        # still be open for download and must not be rewritten in place
+        if os.path.exists(output_path):
+            os.remove(output_path)
+        if cached_path is not None:
+            logger.info(f"Serving cached result {cached_path}")
+            shutil.copyfile(cached_path, output_path)
         else:
-            logger.error(f"Unsupported conversion type: {conversion_type}")
-            return jsonify({"error": f"Unsupported conversion type: {conversion_type}"}), 400
+            # Perform the conversion
+            if conversion_type == "img_to_pdf":
+                convert_img_to_pdf(filepath, output_path)
+            elif conversion_type == "pdf_to_img":
+                convert_pdf_to_img(filepath, output_path)
+            elif conversion_type == "pdf_to_word":
+                convert_pdf_to_word(filepath, output_path)
+            elif conversion_type == "html_to_pdf":
+                convert_html_to_pdf(filepath, output_path)
+            elif conversion_type == "pdf_to_pptx":
+                convert_pdf_to_pptx(filepath, output_path)
+            elif conversion_type == "word_to_pdf":
+                convert_word_to_pdf(filepath, output_path)
+            else:
+                logger.error(f"Unsupported conversion type: {conversion_type}")
+                return jsonify({"error": f"Unsupported conversion type: {conversion_type}"}), 400
         
-        # Verify output file exists
-        if not os.path.exists(output_path):
-            raise FileNotFoundError(f"Conversion did not produce output file: {output_path}")
-            
+            # Verify output file exists
+            if not os.path.exists(output_path):
+                raise FileNotFoundError(f"Conversion did not produce output file: {output_path}")
+
+            result_cache.store(cache_key, output_path)
+
         # Return download URL
         download_url = f"http://localhost:5000/download/{output_filename}"
         logger.info(f"Conversion successful: {filepath} -> {output_path}")
@@ -213,7 +257,8 @@ def api_convert():
         return jsonify({
             "success": True,
             "file_url": download_url,
-            "filename": output_filename
+            "filename": output_filename,
+            "cached": cached_path is not None
         })
         
     except Exception as e:
@@ -240,6 +285,11 @@ def download_file(filename):
     logger.error(f"File not found: {file_path}")
     return jsonify({"error": "File not found"}), 404
 
+@app.route("/api/cache/stats", methods=["GET"])
+def cache_stats():
+    """Hit rate, bytes saved and size of the conversion result cache"""
+    return jsonify(result_cache.stats())
+
 # Add a proper error handler
 @app.errorhandler(Exception)
 def handle_exception(e):
@@ -8,8 +8,9 @@ logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 class FileCleanupService:
-    def __init__(self, directories, max_age_seconds=3600, check_interval_seconds=300):
+    def __init__(self, directories, max_age_seconds=3600, check_interval_seconds=300, result_caches=None):
         self.directories = directories
+        self.result_caches = result_caches or []
         self.max_age_seconds = max_age_seconds
         self.check_interval_seconds = check_interval_seconds
         self.stop_event = threading.Event()
@@ -78,4 +79,11 @@ class FileCleanupService:
                     except Exception as e:
                         logger.error(f"Failed to remove file {filepath}: {str(e)}")
         
-        logger.info(f"Cleanup completed: {cleaned_count} files removed")
\ No newline at end of file
+        logger.info(f"Cleanup completed: {cleaned_count} files removed")
+
+        # Caches keep their entries by recency and size rather than age
+        for cache in self.result_caches:
+            try:
+                cache.evict()
+            except Exception as e:
+                logger.error(f"Failed to evict result cache {cache.root}: {str(e)}")
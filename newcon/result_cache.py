@@ -0,0 +1,32 @@
+import os
+import json
+import hashlib
+
+from content_cache import ContentCache
+
+# Bump when converter output changes so stale results are not served
+CACHE_VERSION = 1
+
+
+class ConversionResultCache(ContentCache):
+    """
+    Conversion outputs keyed by the SHA-256 of the input bytes, the
+    conversion type and the converter options. Entries are evicted least
+    recently used first once the cache exceeds max_bytes, and after
+    max_age_seconds without a hit. Eviction runs from FileCleanupService,
+    which must not monitor the cache directory itself.
+    """
+    def __init__(self, directory, max_bytes=1024 * 1024 * 1024, max_age_seconds=7 * 24 * 3600):
+        super().__init__(
+            directory,
+            max_bytes=max_bytes,
+            max_age=max_age_seconds,
+            evict_interval=None,
+            name="conversion result cache"
+        )
+        os.makedirs(directory, exist_ok=True)
+
+    @staticmethod
+    def make_key(input_sha256, conversion_type, options=None):
+        payload = json.dumps([CACHE_VERSION, input_sha256, conversion_type, options or {}], sort_keys=True)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()